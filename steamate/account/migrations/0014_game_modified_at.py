@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-17 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0013_user_verification_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
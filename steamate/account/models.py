@@ -20,6 +20,8 @@ class Game(models.Model):
     comment = models.TextField(blank = True)
     header_image = models.URLField(blank = True)
     trailer_url = models.URLField(blank = True)
+    # 제목 사전(chatmate.title_matcher)이 다른 워커에서 수정된 게임을 감지하는 데 사용
+    modified_at = models.DateTimeField(auto_now=True)
     
 
 class User(AbstractUser):
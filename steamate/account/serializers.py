@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import User, Genre, Game
+from .models import User, Genre, Game, UserPreferredGame
+from .utils import update_taste_vector
+from chatmate.taste import library_changes
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth import authenticate
@@ -117,7 +119,11 @@ class UserUpdateSerializer(serializers.ModelSerializer):
             instance.preferred_genre.set(preferred_genres)
 
         if preferred_games is not None:
+            before = dict(UserPreferredGame.objects.filter(user=instance).values_list("game_id", "playtime"))
             instance.preferred_game.set(preferred_games)
+            after = dict(UserPreferredGame.objects.filter(user=instance).values_list("game_id", "playtime"))
+            # 추가/제거된 게임만 취향 벡터에 반영
+            update_taste_vector(instance, library_changes(before, after))
 
         instance.save()
         return instance
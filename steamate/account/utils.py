@@ -11,6 +11,9 @@ from django.db import transaction
 
 load_dotenv()
 STEAM_API_KEY = os.getenv('STEAM_API_KEY')
+# 부하 테스트 등에서 스텁 서버로 바꿀 수 있는 Steam API 주소
+STEAM_API_URL = os.getenv('STEAM_API_URL', 'http://api.steampowered.com')
+STEAM_STORE_URL = os.getenv('STEAM_STORE_URL', 'https://store.steampowered.com')
 logger = logging.getLogger(__name__)
 
 
@@ -35,7 +38,7 @@ def get_or_create_game(appid):
         return game  # 기존 데이터 반환
 
     # Steam API에서 게임 정보 가져오기
-    response = requests.get(f"https://store.steampowered.com/api/appdetails?appids={appid}")
+    response = requests.get(f"{STEAM_STORE_URL}/api/appdetails?appids={appid}")
     
     try:
         response.raise_for_status()
@@ -80,13 +83,26 @@ def get_or_create_game(appid):
     return game  # 새로 저장된 게임 반환
 
 
+def update_taste_vector(user, changes):
+    """
+    라이브러리 변경분({appid: 플레이타임, 제거는 None})으로 채팅 추천용 취향 벡터를 증분 갱신
+    실패해도 라이브러리 저장은 유지
+    """
+    # chatmate.utils_v4는 LangChain/OpenAI 클라이언트를 불러오므로 필요할 때만 import
+    from chatmate.utils_v4 import update_user_taste
+    try:
+        update_user_taste(user.id, changes)
+    except Exception as e:
+        logger.exception(f"취향 벡터 갱신 실패 (user_id: {user.id}): {e}")
+
+
 def fetch_steam_library(steamid):
     """
     Steam에서 사용자의 보유 게임 목록을 가져옴
     appid, name, playtime_forever를 반환
     """
     API_KEY = STEAM_API_KEY  # Steam API Key
-    url = "http://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
+    url = f"{STEAM_API_URL}/IPlayerService/GetOwnedGames/v1/"
     
     params = {
         'key': API_KEY,
@@ -168,4 +184,6 @@ def fetch_and_save_user_games(user):
         logger.error(f"UserPreferredGame 생성 오류: {str(e)}")
         return "게임 데이터 저장 중 오류 발생"
     
+    # 새로 저장한 게임만 취향 벡터에 반영
+    update_taste_vector(user, {preferred.game.appid: preferred.playtime for preferred in user_preferred_games})
     return None  # 정상 처리 시 None 반환
\ No newline at end of file
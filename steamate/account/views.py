@@ -16,7 +16,7 @@ from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.exceptions import TokenError
 import os
 from dotenv import load_dotenv
-from .utils import fetch_steam_library, get_or_create_game, get_or_create_genre, fetch_and_save_user_games
+from .utils import fetch_steam_library, get_or_create_game, get_or_create_genre, fetch_and_save_user_games, STEAM_API_URL
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.urls import reverse
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
@@ -314,7 +314,7 @@ class MyPageAPIView(APIView):
         
         # Steam API로 사용자 정보 가져오기
         if user.steam_id:
-            steam_url = f"http://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2/?key={STEAM_API_KEY}&steamids={user.steam_id}"
+            steam_url = f"{STEAM_API_URL}/ISteamUser/GetPlayerSummaries/v2/?key={STEAM_API_KEY}&steamids={user.steam_id}"
             
             try:
                 response = requests.get(steam_url, timeout=5)
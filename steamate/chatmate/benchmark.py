@@ -0,0 +1,290 @@
+import asyncio
+import json
+import random
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+from django.test.utils import override_settings
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from . import utils_v4
+from .cards import build_game_card
+from .metrics import request_trace
+from .numpy_index import write_numpy_index
+from .title_matcher import TitleMatcher
+from .vector_index import percentile_ms
+
+GENRES = ["Action", "Adventure", "RPG", "Strategy", "Simulation", "Puzzle", "Racing", "Sports", "Indie", "Casual"]
+TAGS = [
+    "Open World", "Roguelike", "Co-op", "Story Rich", "Pixel Graphics", "Survival", "Horror", "Fantasy",
+    "Sci-fi", "Turn-Based", "Multiplayer", "Relaxing", "Difficult", "Crafting", "Anime", "Sandbox",
+]
+TITLE_WORDS = [
+    "Star", "Shadow", "Valley", "Dungeon", "Legend", "Farm", "Space", "Knight", "City", "Island",
+    "Dragon", "Racer", "Puzzle", "Quest", "Empire", "Ghost", "Ocean", "Robot", "Forest", "Tower",
+]
+
+# 대표적인 사용자 입력 ({title}은 카탈로그의 게임 제목으로 치환되어 제목 fast path를 거침)
+DEFAULT_INPUTS = [
+    "친구랑 같이 할 수 있는 협동 게임 추천해줘",
+    "스토리가 좋은 RPG 게임 알려줘",
+    "짧게 짧게 할 수 있는 퍼즐 게임 있어?",
+    "무서운 공포 게임 추천 부탁해",
+    "오픈월드 생존 게임 중에 재밌는 거",
+    "힐링되는 농장 시뮬레이션 게임",
+    "어려운 로그라이크 게임 추천해줘",
+    "턴제 전략 게임 좋아하는데 추천해줘",
+    "픽셀 그래픽 인디 게임 알려줘",
+    "레이싱 게임 중에 멀티플레이 되는 거",
+    "{title} 같은 게임 추천해줘",
+    "{title} 재밌게 했는데 비슷한 거 있어?",
+]
+
+
+def fake_answer(prompt, lines=3, fields=()):
+    """프롬프트 해시로 정해지는 답변 (fields가 있으면 각 필드에 같은 목록을 담은 JSON)"""
+    rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+    phrases = [" ".join(rng.sample(TAGS + GENRES, 3)) for _ in range(lines)]
+    if fields:
+        return json.dumps({field: phrases for field in fields}, ensure_ascii=False)
+    return "\n".join(phrases)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    ChatOpenAI 대신 쓰는 결정적 LLM (네트워크 호출 없음)
+    같은 입력에는 항상 같은 답을 내고, latency 초만큼 기다린 뒤 응답합니다.
+    토큰 사용량은 단어 수로 근사해 get_openai_callback에도 집계됩니다.
+    """
+
+    latency: float = 0.0
+    lines: int = 3
+    structured_fields: tuple = ()
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    def _respond(self, messages):
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = fake_answer(prompt, self.lines, self.structured_fields)
+        prompt_tokens = len(prompt.split())
+        completion_tokens = len(content.split())
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            response_metadata={"model_name": "gpt-4o-mini"},
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        words = self._respond(messages).content.split(" ")
+        for word in words:
+            time.sleep(self.latency / len(words))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        words = self._respond(messages).content.split(" ")
+        for word in words:
+            await asyncio.sleep(self.latency / len(words))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+    def with_structured_output(self, schema, **kwargs):
+        structured = self.model_copy(update={"structured_fields": tuple(schema.model_fields)})
+        return structured | RunnableLambda(lambda message: schema.model_validate_json(message.content))
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    OpenAIEmbeddings 대신 쓰는 결정적 임베딩 (단어별 해시 벡터의 합을 정규화)
+    단어를 공유하는 텍스트끼리 가까워지므로 검색 결과가 입력에 따라 달라집니다.
+    """
+
+    def __init__(self, dimensions=None, latency=0.0):
+        self.dimensions = dimensions or settings.CHATMATE_EMBEDDING_DIMENSIONS
+        self.latency = latency
+        self._words = {}
+
+    def _word_vector(self, word):
+        vector = self._words.get(word)
+        if vector is None:
+            rng = np.random.default_rng(zlib.crc32(word.encode("utf-8")))
+            vector = self._words[word] = rng.standard_normal(self.dimensions).astype(np.float32)
+        return vector
+
+    def _embed(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in text.lower().split():
+            vector += self._word_vector(word)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        # 배치 1회 = 요청 1회
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text):
+        return (await self.aembed_documents([text]))[0]
+
+
+class StaticTitleMatcher(TitleMatcher):
+    """DB 대신 주어진 (appid, title) 목록으로 만든 제목 매처"""
+
+    def __init__(self, games):
+        super().__init__()
+        self.build(games)
+
+    def ensure_fresh(self):
+        pass
+
+
+def build_catalog(size, embedding_model, seed=42):
+    """가상 게임 카탈로그 [(appid, title, Document dict)] 와 임베딩 생성"""
+    rng = random.Random(seed)
+    games, documents = [], []
+    for i in range(size):
+        appid = 100000 + i
+        title = f"{' '.join(rng.sample(TITLE_WORDS, 2))} {i}"
+        row = {
+            "name": title,
+            "genres": ", ".join(rng.sample(GENRES, 2)),
+            "tags": ", ".join(rng.sample(TAGS, 4)),
+            "detailed_description": "<p>" + " ".join(rng.sample(TAGS + GENRES + TITLE_WORDS, 12)) + "</p>",
+        }
+        games.append((appid, title))
+        documents.append({
+            "page_content": " | ".join(f"{column}: {value}" for column, value in row.items()),
+            "metadata": {"appid": appid, "genres": row["genres"], "card": build_game_card(row)},
+        })
+    vectors = [embedding_model._embed(doc["page_content"]) for doc in documents]
+    return games, documents, vectors
+
+
+def load_inputs(path=None):
+    if not path:
+        return list(DEFAULT_INPUTS)
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+@contextmanager
+def offline_pipeline(catalog_size=2000, llm_latency=0.3, embedding_latency=0.05, dimensions=None, title_fast_path=True, seed=42):
+    """
+    utils_v4 파이프라인을 가짜 LLM/임베딩, 임시 numpy 인덱스, 메모리 히스토리로 교체합니다.
+    (OpenAI, PGVector, 대화 히스토리/추천 스냅샷/취향 벡터 DB를 사용하지 않음)
+    """
+    embedding_model = FakeEmbeddings(dimensions=dimensions, latency=embedding_latency)
+    games, documents, vectors = build_catalog(catalog_size, embedding_model, seed=seed)
+    histories = {}
+
+    with tempfile.TemporaryDirectory(prefix="chatmate-bench-") as index_dir:
+        write_numpy_index(vectors, documents, index_dir)
+        with override_settings(
+            CHATMATE_RETRIEVER_BACKEND="numpy",
+            CHATMATE_NUMPY_INDEX_DIR=index_dir,
+            CHATMATE_TITLE_FAST_PATH_ENABLED=title_fast_path,
+            # 유저별 스냅샷/취향 벡터는 DB에 있으므로 사용하지 않음
+            CHATMATE_SNAPSHOT_ENABLED=False,
+            CHATMATE_TASTE_FAST_PATH_ENABLED=False,
+        ):
+            previous = utils_v4.configure_pipeline(
+                chat_model=FakeChatModel(latency=llm_latency),
+                embedding_model=embedding_model,
+                history_factory=lambda session_id: histories.setdefault(session_id, InMemoryChatMessageHistory()),
+                matcher=StaticTitleMatcher(games),
+                snapshot_lookup_fn=lambda session_id, genre, appid, index_version: None,
+                taste_lookup_fn=lambda session_id, index_version: None,
+            )
+            try:
+                yield games
+            finally:
+                utils_v4.configure_pipeline(**previous)
+
+
+def summarize(samples_ms):
+    seconds = [value / 1000 for value in samples_ms]
+    return {
+        "count": len(samples_ms),
+        "p50_ms": round(percentile_ms(seconds, 50), 1),
+        "p95_ms": round(percentile_ms(seconds, 95), 1),
+        "p99_ms": round(percentile_ms(seconds, 99), 1),
+    }
+
+
+def run_benchmark(inputs, games, requests=100, concurrency=4, mode=None, cold=False, seed=42):
+    """
+    입력 목록을 순서대로 반복 재생하며 chatbot_call을 concurrency개 스레드에서 실행합니다.
+    반환값: 처리량과 요청/단계별 p50/p95/p99
+    """
+    rng = random.Random(seed)
+    genre = ["RPG", "Indie"]
+    owned = rng.sample(games, min(5, len(games)))
+    game = [title for _, title in owned]
+    appid = [game_appid for game_appid, _ in owned]
+    jobs = [
+        inputs[i % len(inputs)].format(title=rng.choice(games)[1])
+        for i in range(requests)
+    ]
+
+    def run(index_and_input):
+        index, user_input = index_and_input
+        if cold:
+            utils_v4.plan_cache.clear()
+            with utils_v4.retrieval_cache_lock:
+                utils_v4.retrieval_cache.clear()
+        with request_trace("benchmark") as trace:
+            utils_v4.chatbot_call(user_input, f"bench-{index % concurrency}", genre=genre, game=game, appid=appid, mode=mode)
+        return (time.perf_counter() - trace.started_at) * 1000, trace.stages
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(run, enumerate(jobs)))
+    elapsed = time.perf_counter() - started_at
+
+    stages = {}
+    tokens = {}
+    for _, request_stages in results:
+        for stage in request_stages:
+            stages.setdefault(stage["stage"], []).append(stage["ms"])
+            tokens[stage["stage"]] = tokens.get(stage["stage"], 0) + stage["prompt_tokens"] + stage["completion_tokens"]
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "request": summarize([total for total, _ in results]),
+        "stages": {
+            name: {**summarize(samples), "tokens": tokens.get(name, 0)}
+            for name, samples in stages.items()
+        },
+    }
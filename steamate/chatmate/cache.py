@@ -0,0 +1,202 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from cachetools import LRUCache
+from langchain_core.embeddings import Embeddings
+
+from .models import EmbeddingCache
+
+
+def normalize_text(text):
+    """소문자 변환, 공백 정리, 끝 문장부호 제거"""
+    text = re.sub(r"\s+", " ", str(text).strip().lower())
+    return text.rstrip(" .!?~")
+
+
+def canonical_profile(*groups):
+    """장르/게임 목록을 순서와 대소문자에 무관한 문자열로 변환"""
+    return "|".join(
+        ",".join(sorted({normalize_text(item) for item in group or [] if str(item).strip()}))
+        for group in groups
+    )
+
+
+class SemanticCache:
+    """
+    임베딩 유사도 기반 캐시
+    - profile(정확히 일치해야 하는 키) 안에서 벡터 코사인 유사도가 threshold 이상이면 히트
+    - TTL이 지난 항목은 조회 시 제거
+    - maxsize를 넘으면 가장 오래 사용되지 않은 항목부터 제거 (LRU)
+    """
+
+    def __init__(self, maxsize=1000, ttl=3600, threshold=0.95):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remove(self, entry_id):
+        profile, _, _, _ = self._entries.pop(entry_id)
+        bucket = self._buckets.get(profile)
+        if bucket is not None:
+            bucket.discard(entry_id)
+            if not bucket:
+                del self._buckets[profile]
+
+    def get(self, vector, profile):
+        vector = _unit(vector)
+        now = time.monotonic()
+        with self._lock:
+            best_id, best_score = None, self.threshold
+            for entry_id in list(self._buckets.get(profile, ())):
+                _, entry_vector, _, expires_at = self._entries[entry_id]
+                if expires_at < now:
+                    self._remove(entry_id)
+                    continue
+                score = float(entry_vector @ vector)
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id][2]
+
+    def set(self, vector, profile, value):
+        vector = _unit(vector)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (profile, vector, value, time.monotonic() + self.ttl)
+            self._buckets.setdefault(profile, set()).add(entry_id)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    내용 주소 기반 임베딩 캐시
+    프로세스 내 LRU → Postgres(EmbeddingCache) → 실제 임베딩 모델 순서로 조회하고,
+    없는 텍스트만 한 번의 배치로 임베딩한 뒤 두 캐시에 저장합니다.
+    persist가 False면 Postgres 캐시를 읽거나 쓰지 않습니다 (스텁 임베딩을 쓰는 부하 테스트 등).
+    """
+
+    def __init__(self, underlying, model_name, maxsize=10000, persist=True):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.persist = persist
+        self._memory = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _lookup(self, hashes):
+        """LRU와 DB에서 찾은 벡터를 {hash: vector}로 반환"""
+        found = {}
+        with self._lock:
+            for text_hash in hashes:
+                vector = self._memory.get(text_hash)
+                if vector is not None:
+                    found[text_hash] = vector
+
+        missing = [text_hash for text_hash in hashes if text_hash not in found]
+        if missing and self.persist:
+            rows = EmbeddingCache.objects.filter(
+                model_name=self.model_name, text_hash__in=missing
+            ).values_list("text_hash", "vector")
+            with self._lock:
+                for text_hash, vector in rows:
+                    vector = np.frombuffer(bytes(vector), dtype=np.float32).tolist()
+                    self._memory[text_hash] = vector
+                    found[text_hash] = vector
+        return found
+
+    def _store(self, pairs):
+        """새로 계산한 (hash, vector) 목록을 LRU와 DB에 저장"""
+        with self._lock:
+            for text_hash, vector in pairs:
+                self._memory[text_hash] = vector
+        if not self.persist:
+            return
+        EmbeddingCache.objects.bulk_create(
+            [
+                EmbeddingCache(
+                    model_name=self.model_name,
+                    text_hash=text_hash,
+                    vector=np.asarray(vector, dtype=np.float32).tobytes(),
+                )
+                for text_hash, vector in pairs
+            ],
+            ignore_conflicts=True,
+        )
+
+    def _pending(self, texts, found):
+        """캐시에 없는 텍스트를 중복 없이 (hash, text) 목록으로 반환"""
+        pending = {}
+        for text in texts:
+            text_hash = self.text_hash(text)
+            if text_hash not in found:
+                pending.setdefault(text_hash, text)
+        return list(pending.items())
+
+    def embed_documents(self, texts):
+        hashes = [self.text_hash(text) for text in texts]
+        found = self._lookup(hashes)
+        pending = self._pending(texts, found)
+        if pending:
+            vectors = self.underlying.embed_documents([text for _, text in pending])
+            pairs = [(text_hash, list(vector)) for (text_hash, _), vector in zip(pending, vectors)]
+            self._store(pairs)
+            found.update(pairs)
+        return [found[text_hash] for text_hash in hashes]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts):
+        hashes = [self.text_hash(text) for text in texts]
+        found = await sync_to_async(self._lookup)(hashes)
+        pending = self._pending(texts, found)
+        if pending:
+            vectors = await self.underlying.aembed_documents([text for _, text in pending])
+            pairs = [(text_hash, list(vector)) for (text_hash, _), vector in zip(pending, vectors)]
+            await sync_to_async(self._store)(pairs)
+            found.update(pairs)
+        return [found[text_hash] for text_hash in hashes]
+
+    async def aembed_query(self, text):
+        return (await self.aembed_documents([text]))[0]
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
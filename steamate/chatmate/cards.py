@@ -0,0 +1,120 @@
+import html
+import logging
+import re
+from functools import lru_cache
+
+import tiktoken
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CARD_MODEL = "gpt-4o-mini"
+
+# CSV 컬럼 후보 (앞에 있는 컬럼 우선)
+TITLE_COLUMNS = ("name", "title")
+GENRE_COLUMNS = ("genres", "genre")
+TAG_COLUMNS = ("tags", "steamspy_tags", "categories")
+SUMMARY_COLUMNS = ("short_description", "about_the_game", "detailed_description", "description")
+
+
+def strip_html(text):
+    """HTML 태그/엔티티 제거 후 공백 정리"""
+    text = re.sub(r"<(br|/p|/li|/h\d)\s*/?>", " ", str(text), flags=re.IGNORECASE)
+    text = re.sub(r"<[^>]+>", " ", text)
+    return re.sub(r"\s+", " ", html.unescape(text)).strip()
+
+
+def shorten(text, max_chars):
+    """max_chars 이내로 자르되 가능하면 문장 끝에서 자름"""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    sentence_end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "), cut.rfind("다. "))
+    if sentence_end >= max_chars // 2:
+        return cut[:sentence_end + 1].rstrip()
+    return cut.rsplit(" ", 1)[0].rstrip(" ,;") + "…"
+
+
+def _first_value(fields, columns):
+    for column in columns:
+        value = fields.get(column)
+        if value is not None and str(value).strip() and str(value).lower() != "nan":
+            return strip_html(value)
+    return ""
+
+
+def build_game_card(fields, summary_chars=None):
+    """
+    게임 한 행(dict)을 답변 프롬프트용 압축 카드로 변환
+    제목 | 장르 | 태그 | HTML을 제거한 짧은 요약
+    """
+    summary_chars = summary_chars or settings.CHATMATE_CARD_SUMMARY_CHARS
+    title = _first_value(fields, TITLE_COLUMNS) or "Unknown"
+    parts = [title]
+    genres = _first_value(fields, GENRE_COLUMNS)
+    if genres:
+        parts.append(f"장르: {genres}")
+    tags = _first_value(fields, TAG_COLUMNS)
+    if tags:
+        parts.append(f"태그: {shorten(tags, 120)}")
+    summary = _first_value(fields, SUMMARY_COLUMNS)
+    if summary:
+        parts.append(f"요약: {shorten(summary, summary_chars)}")
+    return " | ".join(parts)
+
+
+def parse_page_content(page_content):
+    """row_to_document가 만든 "컬럼: 값 | 컬럼: 값" 문자열을 dict로 복원"""
+    fields = {}
+    for part in page_content.split(" | "):
+        column, sep, value = part.partition(": ")
+        if sep and re.fullmatch(r"\w+", column):
+            fields[column] = value
+        elif fields:
+            # 값 안에 " | "가 있던 경우 직전 컬럼에 이어 붙임
+            last = next(reversed(fields))
+            fields[last] += " | " + part
+    return fields
+
+
+def document_card(doc):
+    """저장된 카드가 있으면 사용, 없으면 (카드 적재 전 문서) 본문에서 생성"""
+    return doc.metadata.get("card") or build_game_card(parse_page_content(doc.page_content))
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    """tiktoken 인코딩 (처음 사용 시 다운로드, 오프라인이면 None)"""
+    try:
+        return tiktoken.encoding_for_model(CARD_MODEL)
+    except Exception as e:
+        logger.warning(f"tiktoken 인코딩을 불러오지 못해 토큰 수를 근사합니다: {e}")
+        return None
+
+
+def count_tokens(text):
+    encoding = get_encoding()
+    if encoding is None:
+        # 한글/영문이 섞인 텍스트 기준 대략 3바이트당 1토큰
+        return len(text.encode("utf-8")) // 3 + 1
+    return len(encoding.encode(text))
+
+
+def assemble_context(docs, max_tokens=None):
+    """
+    관련도 순으로 정렬된 문서의 카드를 토큰 예산 안에서 채워 넣습니다.
+    예산을 넘더라도 최소 1개 문서는 포함합니다.
+    반환값: (context, 사용한 문서 목록, context 토큰 수)
+    """
+    max_tokens = max_tokens or settings.CHATMATE_CONTEXT_TOKEN_BUDGET
+    lines, used, total = [], [], 0
+    for doc in docs:
+        card = document_card(doc)
+        # 줄바꿈 토큰 포함
+        tokens = count_tokens(card) + 1
+        if used and total + tokens > max_tokens:
+            break
+        lines.append(card)
+        used.append(doc)
+        total += tokens
+    return "\n".join(lines), used, total
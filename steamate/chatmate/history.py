@@ -0,0 +1,312 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_openai import ChatOpenAI
+
+from .models import ChatMessage, ChatSession, ChatSessionSummary
+
+logger = logging.getLogger(__name__)
+
+
+class SessionTurns:
+    """
+    한 세션의 누적 요약과 요약되지 않은 턴
+    turns는 ChatMessage.id → (user_message, chatbot_message) 순서 있는 dict이므로
+    id로 찾기/수정/삭제가 O(1)이고 삭제 시 리스트 이동이 없습니다.
+    """
+
+    def __init__(self, turns, fingerprint, summary="", summarized_until=0):
+        self.turns = OrderedDict((message_id, (user, bot)) for message_id, user, bot in turns)
+        self.fingerprint = fingerprint
+        self.summary = summary
+        self.summarized_until = summarized_until
+
+    def messages(self):
+        messages = []
+        if self.summary:
+            messages.append(SystemMessage(content=f"이전 대화 요약: {self.summary}"))
+        for user_message, chatbot_message in self.turns.values():
+            messages.append(HumanMessage(content=user_message))
+            messages.append(AIMessage(content=chatbot_message))
+        return messages
+
+
+def build_summary_chain():
+    summary_prompt = ChatPromptTemplate.from_messages([
+        (
+            "system",
+            """당신은 게임 추천 챗봇의 대화 기록을 요약합니다.
+            기존 요약에 새 대화를 반영해 하나의 요약으로 갱신하세요.
+            - 사용자의 취향(장르, 분위기, 플랫폼, 가격 등), 언급한 게임, 이미 추천받은 게임과 그 반응을 유지
+            - 인사말이나 반복되는 설명은 제외
+            - {max_chars}자 이내의 한국어로 작성"""
+        ),
+        ("human", "기존 요약:\n{summary}\n\n새 대화:\n{turns}"),
+    ])
+    model = ChatOpenAI(model=settings.CHATMATE_HISTORY_SUMMARY_MODEL, temperature=0)
+    return summary_prompt | model | StrOutputParser()
+
+
+class HistoryStore:
+    """
+    대화 히스토리 저장소 인터페이스
+    - load(session_id): 누적 요약 + 요약되지 않은 최근 턴의 메시지 목록
+    - append_turn(message): 저장된 ChatMessage를 히스토리에 추가
+    - update_turn(message): 수정된 ChatMessage 반영
+    - remove_turn(session_id, message_id): 턴 제거
+    - invalidate(session_id): 로컬 캐시 무효화
+    - record_change(session_id): 시그널 없이 바뀐 히스토리(QuerySet.update 등)를 모든 워커 캐시에서 무효화
+
+    최근 window_turns 턴은 그대로 두고, 요약되지 않은 턴이 window_turns + summary_batch 개가 되면
+    오래된 턴들을 백그라운드에서 누적 요약(ChatSessionSummary)에 접어 넣습니다.
+    프롬프트에는 요약 1개와 최대 window_turns + summary_batch - 1 턴만 들어가므로 세션 길이와 무관하게 일정합니다.
+    """
+
+    def __init__(self, window_turns=None, summary_batch=None, cache_size=None):
+        self.window_turns = window_turns or settings.CHATMATE_HISTORY_MAX_TURNS
+        self.summary_batch = summary_batch or settings.CHATMATE_HISTORY_SUMMARY_BATCH
+        self._sessions = LRUCache(maxsize=cache_size or settings.CHATMATE_HISTORY_CACHE_SIZE)
+        self._lock = threading.Lock()
+        self._summary_chain = None
+        self._summarizing = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chatmate-summary")
+
+    @property
+    def max_turns(self):
+        """요약 실패 시에도 넘지 않는 턴 수 상한"""
+        return self.window_turns + self.summary_batch
+
+    def _fetch(self, session_id):
+        """DB에서 요약과 요약 이후 턴(최대 max_turns)을 오래된 순서로 읽기"""
+        summary = ChatSessionSummary.objects.filter(session_id=session_id).values_list(
+            "summary", "summarized_until"
+        ).first() or ("", 0)
+        rows = ChatMessage.objects.filter(
+            session_id=session_id, id__gt=summary[1], status=ChatMessage.Status.DONE
+        ).order_by("-id").values_list(
+            "id", "user_message", "chatbot_message"
+        )[:self.max_turns]
+        return list(reversed(rows)), summary
+
+    def _fingerprint(self, session_id):
+        return None
+
+    def _get(self, session_id):
+        with self._lock:
+            cached = self._sessions.get(session_id)
+        fingerprint = self._fingerprint(session_id)
+        if cached is not None and (fingerprint is None or cached.fingerprint == fingerprint):
+            return cached
+        turns, (summary, summarized_until) = self._fetch(session_id)
+        cached = SessionTurns(turns, fingerprint, summary, summarized_until)
+        with self._lock:
+            self._sessions[session_id] = cached
+        return cached
+
+    def load(self, session_id):
+        return self._get(session_id).messages()
+
+    def append_turn(self, message):
+        session_id = message.session_id_id
+        self._bump_version(session_id)
+        with self._lock:
+            cached = self._sessions.get(session_id)
+            if cached is None:
+                return
+            cached.turns[message.id] = (message.user_message, message.chatbot_message)
+            while len(cached.turns) > self.max_turns:
+                cached.turns.popitem(last=False)
+            cached.fingerprint = self._advance_fingerprint(cached.fingerprint)
+            pending = len(cached.turns)
+        if pending >= self.max_turns:
+            self.schedule_summary(session_id)
+
+    def update_turn(self, message):
+        session_id = message.session_id_id
+        self._bump_version(session_id)
+        with self._lock:
+            cached = self._sessions.get(session_id)
+            if cached is None:
+                return
+            if message.id in cached.turns:
+                cached.turns[message.id] = (message.user_message, message.chatbot_message)
+                cached.fingerprint = self._advance_fingerprint(cached.fingerprint)
+            elif message.id > cached.summarized_until:
+                # 수정 중 히스토리에서 빠졌던 턴은 원래 순서로 다시 읽음
+                self._sessions.pop(session_id, None)
+            else:
+                cached.fingerprint = self._advance_fingerprint(cached.fingerprint)
+
+    def _bump_version(self, session_id):
+        """다른 워커가 볼 히스토리 버전 증가 (공유 저장소가 없으면 아무것도 하지 않음)"""
+
+    def _advance_fingerprint(self, fingerprint):
+        """이 프로세스의 변경(_bump_version 1회)을 반영한 캐시 지문"""
+        return fingerprint
+
+    def remove_turn(self, session_id, message_id):
+        """ChatMessage.id로 턴 제거 (요약에 이미 접힌 턴이면 False)"""
+        cached = self._get(session_id)
+        with self._lock:
+            return cached.turns.pop(message_id, None) is not None
+
+    def forget_turn(self, session_id, message_id):
+        """삭제된 ChatMessage를 로컬 캐시에서 제거 (캐시가 없으면 아무것도 하지 않음)"""
+        self._bump_version(session_id)
+        with self._lock:
+            cached = self._sessions.get(session_id)
+            if cached is not None:
+                cached.turns.pop(message_id, None)
+                cached.fingerprint = self._advance_fingerprint(cached.fingerprint)
+
+    def invalidate(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def record_change(self, session_id):
+        self._bump_version(session_id)
+        self.invalidate(session_id)
+
+    def schedule_summary(self, session_id):
+        """응답을 늦추지 않도록 요약은 백그라운드 스레드에서 실행 (세션당 동시에 1개)"""
+        with self._lock:
+            if session_id in self._summarizing:
+                return
+            self._summarizing.add(session_id)
+        self._executor.submit(self._summarize_in_background, session_id)
+
+    def _summarize_in_background(self, session_id):
+        try:
+            self.summarize(session_id)
+        except Exception as e:
+            logger.error(f"세션 {session_id} 히스토리 요약 실패: {e}")
+        finally:
+            with self._lock:
+                self._summarizing.discard(session_id)
+            connections.close_all()
+
+    def summarize(self, session_id):
+        """
+        최근 window_turns 턴을 제외한 요약되지 않은 턴을 기존 요약에 접어 넣습니다.
+        여러 워커가 동시에 실행해도 summarized_until 조건부 UPDATE로 한 번만 반영됩니다.
+        """
+        summary, _ = ChatSessionSummary.objects.get_or_create(session_id_id=session_id)
+        turns = list(reversed(ChatMessage.objects.filter(
+            session_id=session_id, id__gt=summary.summarized_until, status=ChatMessage.Status.DONE
+        ).order_by("-id").values_list("id", "user_message", "chatbot_message")))
+        if len(turns) < self.max_turns:
+            return False
+        to_fold = turns[:-self.window_turns]
+
+        if self._summary_chain is None:
+            self._summary_chain = build_summary_chain()
+        new_summary = self._summary_chain.invoke({
+            "summary": summary.summary or "(없음)",
+            "turns": "\n".join(f"사용자: {user}\n챗봇: {bot}" for _, user, bot in to_fold),
+            "max_chars": settings.CHATMATE_HISTORY_SUMMARY_MAX_CHARS,
+        })
+        updated = ChatSessionSummary.objects.filter(
+            pk=summary.pk, summarized_until=summary.summarized_until
+        ).update(summary=new_summary.strip(), summarized_until=to_fold[-1][0])
+        if updated:
+            self.record_change(session_id)
+        return bool(updated)
+
+
+class LocalHistoryStore(HistoryStore):
+    """
+    프로세스 내 캐시만 사용 (캐시가 없을 때만 DB에서 읽음)
+    단일 프로세스 개발 환경용, 다른 워커의 변경은 캐시가 밀려날 때까지 보이지 않습니다.
+    """
+
+
+class PostgresHistoryStore(HistoryStore):
+    """
+    ChatMessage 테이블을 모든 워커가 공유하는 히스토리 저장소로 사용하고 로컬 LRU로 읽기를 줄입니다.
+    - 쓰기: ChatMessage INSERT 자체가 공유 저장소 쓰기 (post_save 시그널로 로컬 캐시도 갱신)
+    - 읽기: 세션의 history_version이 캐시와 같으면 로컬 캐시 (PK 조회 1회), 다르면 요약 이후 턴만 다시 읽음
+    - 턴 추가/수정/삭제 시그널과 요약 UPDATE가 history_version을 증가시킴
+    """
+
+    def _fingerprint(self, session_id):
+        return ChatSession.objects.filter(pk=session_id).values_list("history_version", flat=True).first()
+
+    def _bump_version(self, session_id):
+        ChatSession.objects.filter(pk=session_id).update(history_version=F("history_version") + 1)
+
+    def _advance_fingerprint(self, fingerprint):
+        # 다른 워커가 그 사이에 버전을 올렸으면 다음 읽기에서 버전이 달라 다시 읽게 됨
+        return None if fingerprint is None else fingerprint + 1
+
+
+HISTORY_BACKENDS = {
+    "postgres": PostgresHistoryStore,
+    "local": LocalHistoryStore,
+}
+
+_history_store = None
+_history_store_lock = threading.Lock()
+
+
+def get_history_store():
+    global _history_store
+    if _history_store is None:
+        with _history_store_lock:
+            if _history_store is None:
+                backend = settings.CHATMATE_HISTORY_BACKEND
+                if backend not in HISTORY_BACKENDS:
+                    raise ValueError(f"지원하지 않는 히스토리 백엔드입니다: {backend}")
+                _history_store = HISTORY_BACKENDS[backend]()
+    return _history_store
+
+
+class SessionHistory(BaseChatMessageHistory):
+    """
+    RunnableWithMessageHistory용 히스토리
+    메시지는 체인 실행 시점에 저장소에서 읽고, 답변은 뷰에서 ChatMessage를 저장할 때 반영되므로
+    add_messages는 아무것도 하지 않습니다.
+    """
+
+    def __init__(self, session_id, store=None):
+        self.session_id = session_id
+        self.store = store or get_history_store()
+
+    @property
+    def messages(self):
+        return self.store.load(self.session_id)
+
+    def add_messages(self, messages):
+        pass
+
+    def clear(self):
+        self.store.invalidate(self.session_id)
+
+
+def _on_message_saved(sender, instance, created, **kwargs):
+    # 답변 생성 중(pending)이거나 실패한 턴은 히스토리에 넣지 않음
+    if instance.status != ChatMessage.Status.DONE:
+        return
+    store = get_history_store()
+    if created:
+        store.append_turn(instance)
+    else:
+        store.update_turn(instance)
+
+
+def _on_message_deleted(sender, instance, **kwargs):
+    get_history_store().forget_turn(instance.session_id_id, instance.id)
+
+
+post_save.connect(_on_message_saved, sender=ChatMessage, dispatch_uid="chatmate_history_save")
+post_delete.connect(_on_message_deleted, sender=ChatMessage, dispatch_uid="chatmate_history_delete")
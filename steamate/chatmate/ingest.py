@@ -0,0 +1,155 @@
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import tiktoken
+from django.db import connections
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .utils_v4 import (EMBEDDING_MODEL, GAMES_CSV_PATH, embeddings, load_and_chunk_csv,
+                       get_vector_store, count_vectorstore_documents, bump_index_version)
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(page_content):
+    return hashlib.sha256(page_content.encode("utf-8")).hexdigest()
+
+
+def stored_content_hashes(store):
+    """컬렉션에 이미 저장된 문서들의 내용 해시 (DB에서 계산, 임베딩 호출 없음)"""
+    with Session(store._bind) as session:
+        collection = store.get_collection(session)
+        if collection is None:
+            return set()
+        rows = session.execute(
+            text(
+                "SELECT encode(sha256(convert_to(document, 'UTF8')), 'hex') "
+                "FROM langchain_pg_embedding WHERE collection_id = :collection_id"
+            ),
+            {"collection_id": collection.uuid},
+        )
+        return {row[0] for row in rows}
+
+
+class RateLimiter:
+    """초당 요청 수 제한 (워커 스레드 간 공유)"""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            wait_for = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+
+class IngestStats:
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.added = 0
+        self.tokens = 0
+        self.started_at = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            "rows": self.rows,
+            "skipped": self.skipped,
+            "added": self.added,
+            "tokens": self.tokens,
+            "seconds": elapsed,
+            "rows_per_second": self.added / elapsed if elapsed else 0.0,
+            "tokens_per_second": self.tokens / elapsed if elapsed else 0.0,
+        }
+
+
+def ingest_csv(file_path=GAMES_CSV_PATH, batch_size=100, workers=4, requests_per_second=0, store=None, log=logger.info):
+    """
+    게임 CSV를 스트리밍하며 벡터 스토어에 적재합니다.
+    - 내용 해시가 이미 저장된 행은 건너뜀 (중단 후 다시 실행하면 이어서 적재)
+    - 배치 임베딩 + 저장을 workers개 스레드에서 동시에 실행, requests_per_second로 임베딩 요청 제한
+    - 배치마다 커밋되므로 중간에 실패해도 완료된 배치는 유지
+    """
+    store = store or get_vector_store()
+    existing = stored_content_hashes(store)
+    encoding = tiktoken.encoding_for_model(EMBEDDING_MODEL)
+    limiter = RateLimiter(requests_per_second)
+    stats = IngestStats()
+
+    def ingest_batch(documents):
+        try:
+            texts = [doc.page_content for doc in documents]
+            limiter.wait()
+            vectors = embeddings.embed_documents(texts)
+            store.add_embeddings(
+                texts=texts,
+                embeddings=vectors,
+                metadatas=[doc.metadata for doc in documents],
+                ids=[content_hash(text) for text in texts],
+            )
+            tokens = sum(len(encoding.encode(text)) for text in texts)
+            with stats.lock:
+                stats.added += len(documents)
+                stats.tokens += tokens
+        finally:
+            # 워커 스레드에서 연 Django DB 연결 정리 (임베딩 캐시 조회용)
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for documents in load_and_chunk_csv(chunk_size=batch_size, file_path=file_path):
+            stats.rows += len(documents)
+            batch = []
+            for doc in documents:
+                doc_hash = content_hash(doc.page_content)
+                if doc_hash in existing:
+                    stats.skipped += 1
+                    continue
+                existing.add(doc_hash)
+                batch.append(doc)
+            if not batch:
+                continue
+
+            # 메모리 사용을 제한하기 위해 동시에 대기하는 배치 수를 workers * 2로 제한
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(executor.submit(ingest_batch, batch))
+            log(f"rows read: {stats.rows}, added: {stats.added}, skipped: {stats.skipped}")
+
+        for future in pending:
+            future.result()
+
+    if stats.added:
+        bump_index_version(store)
+    return stats.report()
+
+
+def initialize_vectorstore(rebuild=False, log=logger.info, **ingest_options):
+    """벡터 스토어를 연결하고 CSV에서 아직 적재되지 않은 행을 적재합니다. (log: 진행 상황 출력 함수)"""
+    store = get_vector_store()
+    if rebuild:
+        log("PGVector 컬렉션을 삭제하고 다시 생성합니다.")
+        store.delete_collection()
+        store.create_collection()
+
+    report = ingest_csv(store=store, log=log, **ingest_options)
+    if report["added"]:
+        log(f"PGVector 벡터 DB에 {report['added']}개 문서를 적재했습니다.")
+    else:
+        log(f"기존 PGVector 벡터 DB를 로드했습니다. ({count_vectorstore_documents(store)}개 문서)")
+    return store, report
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .history import get_history_store
+from .metrics import registry, request_trace
+from .models import ChatMessage, ChatRequest
+from .utils_v4 import chatbot_call
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """작업 풀의 실행 중 + 대기 작업이 상한에 도달함"""
+
+
+class ChatJobPool:
+    """
+    답변 생성 작업을 실행하는 워커 프로세스 내 스레드 풀
+    - 동시에 workers개까지 실행하고 queue_size개까지 대기열에 쌓음
+    - 자리가 없으면 JobQueueFull (요청 스레드를 막지 않고 즉시 거절)
+    """
+
+    def __init__(self, workers=None, queue_size=None):
+        self.workers = workers or settings.CHATMATE_JOB_WORKERS
+        self.capacity = self.workers + (queue_size if queue_size is not None else settings.CHATMATE_JOB_QUEUE_SIZE)
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="chatmate-job")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+
+    def reserve(self):
+        """작업 한 개 자리를 예약 (submit 또는 cancel로 반드시 정리)"""
+        if not self._slots.acquire(blocking=False):
+            registry.inc("chatmate_jobs_total", "Chat generation jobs", outcome="rejected")
+            raise JobQueueFull()
+
+    def cancel(self):
+        self._slots.release()
+
+    def submit(self, fn, *args):
+        """reserve()로 자리를 예약한 뒤 호출"""
+        with self._lock:
+            self.queued += 1
+        self._executor.submit(self._run, time.perf_counter(), fn, *args)
+
+    def _run(self, enqueued_at, fn, *args):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        registry.observe("chatmate_job_queue_wait_seconds", "Time chat jobs wait for a worker", time.perf_counter() - enqueued_at)
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.exception(f"답변 생성 작업 실행 실패: {e}")
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+            connections.close_all()
+
+
+_job_pool = None
+_job_pool_lock = threading.Lock()
+
+
+def get_job_pool():
+    global _job_pool
+    if _job_pool is None:
+        with _job_pool_lock:
+            if _job_pool is None:
+                pool = ChatJobPool()
+                registry.gauge("chatmate_job_queue_depth", "Chat jobs waiting for a worker", lambda: pool.queued)
+                registry.gauge("chatmate_job_running", "Chat jobs currently running", lambda: pool.running)
+                registry.gauge("chatmate_job_capacity", "Maximum running plus queued chat jobs", lambda: pool.capacity)
+                _job_pool = pool
+    return _job_pool
+
+
+def enqueue_chat_job(serializer, session, genre, game, appid, mode=None):
+    """
+    ChatMessage를 pending 상태로 저장하고 답변 생성을 작업 풀에 넘김
+    풀이 가득 차 있으면 행을 만들지 않고 JobQueueFull
+    """
+    pool = get_job_pool()
+    pool.reserve()
+    try:
+        message = serializer.save(session_id=session, chatbot_message="", status=ChatMessage.Status.PENDING)
+    except Exception:
+        pool.cancel()
+        raise
+    pool.submit(run_chat_job, message.id, genre, game, appid, mode)
+    return message
+
+
+def run_chat_job(message_id, genre, game, appid, mode=None):
+    """pending 메시지의 답변을 생성해 채움 (작업 중 삭제/실패 처리된 메시지는 건드리지 않음)"""
+    message = ChatMessage.objects.filter(pk=message_id, status=ChatMessage.Status.PENDING).first()
+    if message is None:
+        return
+    try:
+        with request_trace("chat_message_job", session_id=message.session_id_id):
+            chatbot_message = chatbot_call(message.user_message, message.session_id_id, genre=genre, game=game, appid=appid, mode=mode)
+    except Exception:
+        fail_job(message_id)
+        registry.inc("chatmate_jobs_total", "Chat generation jobs", outcome="failed")
+        raise
+
+    complete_message(message_id, message.session_id_id, chatbot_message)
+    registry.inc("chatmate_jobs_total", "Chat generation jobs", outcome="done")
+
+
+def complete_message(message_id, session_id, chatbot_message):
+    """pending 메시지에 답변을 채움 (그 사이 삭제/실패 처리된 메시지는 건드리지 않음)"""
+    updated = ChatMessage.objects.filter(pk=message_id, status=ChatMessage.Status.PENDING).update(
+        chatbot_message=chatbot_message, status=ChatMessage.Status.DONE, modified_at=timezone.now(),
+    )
+    # QuerySet.update는 post_save 시그널을 보내지 않으므로 모든 워커의 히스토리 캐시를 직접 무효화
+    get_history_store().record_change(session_id)
+    return bool(updated)
+
+
+def fail_job(message_id):
+    updated = ChatMessage.objects.filter(pk=message_id, status=ChatMessage.Status.PENDING).update(
+        status=ChatMessage.Status.FAILED, modified_at=timezone.now(),
+    )
+    # 중복 요청 병합 기록이 실패한 메시지를 돌려주지 않도록 정리 (재시도는 새로 처리)
+    ChatRequest.objects.filter(chat_message_id=message_id).delete()
+    return bool(updated)
+
+
+def expire_stale_job(message):
+    """
+    작업을 실행하던 워커가 죽어 pending으로 남은 메시지를 실패 처리
+    반환값: 갱신된 메시지
+    """
+    if message.status != ChatMessage.Status.PENDING:
+        return message
+    if message.created_at >= timezone.now() - timedelta(seconds=settings.CHATMATE_JOB_TIMEOUT):
+        return message
+    if fail_job(message.id):
+        logger.warning(f"답변 생성 작업 시간 초과 (message_id: {message.id})")
+    return ChatMessage.objects.filter(pk=message.id).first()
+
+
+def poll_message(session_id, message_id):
+    """메시지 조회 (없으면 None), 오래된 pending은 실패로 바꿔 반환"""
+    message = ChatMessage.objects.filter(pk=message_id, session_id=session_id).first()
+    return expire_stale_job(message) if message is not None else None
+
+
+async def await_message(session_id, message_id, timeout):
+    """
+    롱 폴링: 메시지가 pending이 아니게 되거나 timeout초가 지날 때까지 기다림
+    작업은 다른 워커 프로세스에서 실행될 수 있으므로 DB를 주기적으로 확인합니다.
+    """
+    deadline = time.monotonic() + min(timeout, settings.CHATMATE_JOB_LONG_POLL_MAX)
+    message = await sync_to_async(poll_message)(session_id, message_id)
+    while message is not None and message.status == ChatMessage.Status.PENDING and time.monotonic() < deadline:
+        await asyncio.sleep(settings.CHATMATE_JOB_POLL_INTERVAL)
+        message = await sync_to_async(poll_message)(session_id, message_id)
+    return message
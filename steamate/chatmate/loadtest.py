@@ -0,0 +1,447 @@
+import base64
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+from django.conf import settings
+from django.db import connections, transaction
+
+from account.models import User
+from .benchmark import DEFAULT_INPUTS, GENRES, FakeEmbeddings, build_catalog, fake_answer
+from .models import ChatSession
+from .numpy_index import write_numpy_index
+from .vector_index import percentile_ms
+
+LOADTEST_USER_PREFIX = "loadtest_"
+LOADTEST_STEAM_ID_BASE = 76561190000000000
+
+# 이름 → (gunicorn 앱, 워커 옵션, 채팅 메시지 경로)
+# {workers}, {threads}는 실행 시 치환
+WORKER_CONFIGS = {
+    "sync": ("config.wsgi:application", ["-k", "sync", "-w", "{workers}"], "message/"),
+    "gthread": ("config.wsgi:application", ["-k", "gthread", "-w", "{workers}", "--threads", "{threads}"], "message/"),
+    "asgi": ("config.asgi:application", ["-k", "uvicorn.workers.UvicornWorker", "-w", "{workers}"], "message/"),
+    # ASGI + 비동기 채팅 뷰 (AsyncChatMessageView)
+    "asgi-async": ("config.asgi:application", ["-k", "uvicorn.workers.UvicornWorker", "-w", "{workers}"], "message/async/"),
+}
+
+ENDPOINTS = ("login", "chat", "mypage")
+
+
+class StubBackendHandler(BaseHTTPRequestHandler):
+    """
+    OpenAI(/v1/chat/completions, /v1/embeddings)와 Steam Web API/Store API를 흉내 내는 스텁
+    응답은 요청 내용으로 결정되고, 서버에 설정한 지연 시간만큼 기다린 뒤 돌려줍니다.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path.endswith("/chat/completions"):
+            self.chat_completions(self._read_json())
+        elif path.endswith("/embeddings"):
+            self.embeddings(self._read_json())
+        else:
+            self._send_json({"error": {"message": f"unknown path {path}"}}, status=404)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        time.sleep(self.server.steam_latency)
+        if url.path.startswith("/ISteamUser/GetPlayerSummaries"):
+            self._send_json(self.server.player_summaries(query.get("steamids", "")))
+        elif url.path.startswith("/IPlayerService/GetOwnedGames"):
+            self._send_json(self.server.owned_games(query.get("steamid", "")))
+        elif url.path.startswith("/api/appdetails"):
+            self._send_json(self.server.app_details(query.get("appids", "")))
+        else:
+            self._send_json({"error": f"unknown path {url.path}"}, status=404)
+
+    def chat_completions(self, payload):
+        prompt = "\n".join(str(message.get("content") or "") for message in payload.get("messages", []))
+        response_format = payload.get("response_format") or {}
+        fields = ()
+        if response_format.get("type") == "json_schema":
+            fields = tuple(response_format["json_schema"]["schema"].get("properties", {}))
+        content = fake_answer(prompt, fields=fields)
+        usage = {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(content.split()),
+            "total_tokens": len(prompt.split()) + len(content.split()),
+        }
+        completion_id = f"chatcmpl-{zlib.crc32(prompt.encode('utf-8')):08x}"
+        model = payload.get("model", "gpt-4o-mini")
+
+        if not payload.get("stream"):
+            time.sleep(self.server.llm_latency)
+            self._send_json({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content, "refusal": None},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+            return
+
+        # 스트리밍: 단어 단위 SSE 청크 (지연 시간을 청크에 나눠 씀)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            time.sleep(self.server.llm_latency / len(words))
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+        final = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            final["usage"] = usage
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.close_connection = True
+
+    def embeddings(self, payload):
+        inputs = payload.get("input", [])
+        # 문자열, 문자열 목록, (tiktoken으로 자른) 토큰 id 목록을 모두 받음
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        texts = [item if isinstance(item, str) else " ".join(map(str, item)) for item in inputs]
+        vectors = [self.server.embedding_model._embed(text) for text in texts]
+        time.sleep(self.server.embedding_latency)
+
+        def encode(vector):
+            if payload.get("encoding_format") == "base64":
+                return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+            return vector
+
+        tokens = sum(len(text.split()) for text in texts)
+        self._send_json({
+            "object": "list",
+            "data": [{"object": "embedding", "index": i, "embedding": encode(vector)} for i, vector in enumerate(vectors)],
+            "model": payload.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+
+class StubBackendServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, games, llm_latency=0.3, embedding_latency=0.05, steam_latency=0.05, dimensions=None):
+        super().__init__(address, StubBackendHandler)
+        self.games = games
+        self.titles = dict(games)
+        self.llm_latency = llm_latency
+        self.embedding_latency = embedding_latency
+        self.steam_latency = steam_latency
+        self.embedding_model = FakeEmbeddings(dimensions=dimensions)
+
+    def player_summaries(self, steam_ids):
+        players = [
+            {
+                "steamid": steam_id,
+                "personaname": f"loadtest-{steam_id[-4:]}",
+                "profileurl": f"https://steamcommunity.com/profiles/{steam_id}/",
+                "avatar": "https://avatars.steamstatic.com/loadtest.jpg",
+                "loccountrycode": "KR",
+            }
+            for steam_id in steam_ids.split(",") if steam_id
+        ]
+        return {"response": {"players": players}}
+
+    def owned_games(self, steam_id):
+        rng = random.Random(steam_id)
+        owned = rng.sample(self.games, min(20, len(self.games)))
+        return {"response": {"game_count": len(owned), "games": [
+            {"appid": appid, "name": title, "playtime_forever": rng.randint(0, 6000)} for appid, title in owned
+        ]}}
+
+    def app_details(self, appid):
+        title = self.titles.get(int(appid)) if appid.isdigit() else None
+        if title is None:
+            return {appid: {"success": False}}
+        rng = random.Random(appid)
+        return {appid: {"success": True, "data": {
+            "name": title,
+            "genres": [{"description": genre} for genre in rng.sample(GENRES, 2)],
+            "release_date": {"date": "2020-01-01"},
+        }}}
+
+
+def _serve_stub_backends(port, games, options):
+    StubBackendServer(("127.0.0.1", port), games, **options).serve_forever()
+
+
+def start_stub_backends(port, games, **options):
+    """
+    스텁 서버를 별도 프로세스로 실행 (부하 생성 스레드와 GIL을 나눠 쓰지 않도록)
+    반환값: (프로세스, 기본 URL)
+    """
+    # fork된 자식이 부모의 DB 연결을 물려받지 않도록 먼저 닫음
+    connections.close_all()
+    process = multiprocessing.Process(target=_serve_stub_backends, args=(port, games, options), daemon=True)
+    process.start()
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{base_url}/health", timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("스텁 서버가 시작되지 않았습니다.")
+
+
+def prepare_stub_index(index_dir, catalog_size, dimensions=None, seed=42):
+    """가상 카탈로그로 numpy 인덱스를 만들고 카탈로그 [(appid, title)] 반환"""
+    games, documents, vectors = build_catalog(catalog_size, FakeEmbeddings(dimensions=dimensions), seed=seed)
+    write_numpy_index(vectors, documents, index_dir)
+    return games
+
+
+def prepare_accounts(count, password):
+    """
+    부하 테스트용 인증 완료 계정과 채팅 세션을 만들거나 재사용합니다.
+    반환값: [{"id", "username", "session_id"}]
+    """
+    accounts = []
+    with transaction.atomic():
+        for i in range(count):
+            username = f"{LOADTEST_USER_PREFIX}{i}"
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                user = User(
+                    username=username,
+                    nickname=username,
+                    email=f"{username}@loadtest.invalid",
+                    steam_id=str(LOADTEST_STEAM_ID_BASE + i),
+                    birth=date(2000, 1, 1),
+                    is_verified=True,
+                )
+                user.set_password(password)
+                user.save()
+            session = ChatSession.objects.filter(user_id=user).order_by("id").first() or ChatSession.objects.create(user_id=user)
+            accounts.append({"id": user.id, "username": username, "session_id": session.id})
+    return accounts
+
+
+def delete_accounts():
+    """부하 테스트 계정 삭제 (세션/메시지는 CASCADE)"""
+    deleted, _ = User.objects.filter(username__startswith=LOADTEST_USER_PREFIX).delete()
+    return deleted
+
+
+def server_env(stub_url, index_dir, overrides=()):
+    """앱 서버 프로세스 환경 변수 (OpenAI/Steam은 스텁, 검색은 임시 numpy 인덱스)"""
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "OPENAI_API_KEY": "loadtest",
+        "STEAM_API_URL": stub_url,
+        "STEAM_STORE_URL": stub_url,
+        "STEAM_API_KEY": "loadtest",
+        "CHATMATE_RETRIEVER_BACKEND": "numpy",
+        "CHATMATE_NUMPY_INDEX_DIR": index_dir,
+        "CHATMATE_EMBEDDING_DIMENSIONS": str(settings.CHATMATE_EMBEDDING_DIMENSIONS),
+        # 스텁이 실제 모델 이름으로 가짜 벡터를 돌려주므로 공유 임베딩 캐시에 저장하지 않음
+        "CHATMATE_EMBEDDING_CACHE_PERSIST": "False",
+        "CHATMATE_LOG_LEVEL": "WARNING",
+        "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings"),
+    })
+    env.update(overrides)
+    return env
+
+
+def start_server(config, port, env, workers=2, threads=4, timeout=120):
+    """gunicorn으로 앱 서버를 띄우고 /api/v1/chat/ready/가 응답할 때까지 기다림"""
+    app, worker_args, _ = WORKER_CONFIGS[config]
+    command = [
+        sys.executable, "-m", "gunicorn", app,
+        *[arg.format(workers=workers, threads=threads) for arg in worker_args],
+        "--bind", f"127.0.0.1:{port}",
+        "--timeout", str(timeout),
+        "--log-level", "warning",
+    ]
+    process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{config} 서버가 시작 중 종료되었습니다 (exit code {process.returncode}).")
+        try:
+            requests.get(f"{base_url}/api/v1/chat/ready/", timeout=2)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.5)
+    stop_server(process)
+    raise RuntimeError(f"{config} 서버가 60초 안에 응답하지 않습니다.")
+
+
+def stop_server(process):
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def parse_mix(value):
+    """"login=1,chat=3,mypage=6" → {"login": 1.0, "chat": 3.0, "mypage": 6.0}"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"알 수 없는 엔드포인트입니다: {name}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("가중치 합이 0입니다.")
+    return mix
+
+
+class VirtualUser:
+    """로그인 후 가중치에 따라 로그인/채팅/마이페이지 요청을 반복하는 가상 사용자"""
+
+    def __init__(self, base_url, account, password, chat_path, inputs, seed, timeout):
+        self.base_url = base_url
+        self.account = account
+        self.password = password
+        self.chat_path = chat_path
+        self.inputs = inputs
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.access = None
+        self.sent = 0
+
+    def login(self):
+        response = self.http.post(
+            f"{self.base_url}/api/v1/account/login/",
+            json={"username": self.account["username"], "password": self.password},
+            timeout=self.timeout,
+        )
+        if response.ok:
+            self.access = response.json().get("access")
+        return response
+
+    def chat(self):
+        self.sent += 1
+        # 같은 세션에서 같은 입력을 반복하면 중복 요청 병합으로 재사용되므로 번호를 붙임
+        user_message = f"{self.rng.choice(self.inputs)} ({self.sent})"
+        return self.http.post(
+            f"{self.base_url}/api/v1/chat/{self.account['session_id']}/{self.chat_path}",
+            json={"user_message": user_message},
+            headers={"Authorization": f"Bearer {self.access}"},
+            timeout=self.timeout,
+        )
+
+    def mypage(self):
+        return self.http.get(f"{self.base_url}/api/v1/account/{self.account['id']}/", timeout=self.timeout)
+
+    def run(self, mix, started_at, warmup_until, stop_at, samples):
+        names, weights = list(mix), list(mix.values())
+        endpoint = "login"
+        while time.monotonic() < stop_at:
+            if self.access is None and endpoint == "chat":
+                endpoint = "login"
+            request_started = time.monotonic()
+            try:
+                ok = getattr(self, endpoint)().status_code < 400
+            except requests.RequestException:
+                ok = False
+            finished = time.monotonic()
+            if request_started >= warmup_until and finished <= stop_at:
+                samples.append((endpoint, finished - started_at, finished - request_started, ok))
+            endpoint = self.rng.choices(names, weights)[0]
+
+
+def run_load(base_url, accounts, password, mix, chat_path, concurrency=16, duration=60, warmup=10, inputs=None, seed=42, timeout=120):
+    """
+    concurrency개의 가상 사용자(스레드)가 duration초 동안 요청을 보냅니다 (처음 warmup초는 집계 제외).
+    반환값: [(엔드포인트, 완료 시각, 지연 시간, 성공 여부)]
+    """
+    inputs = [text.replace("{title}", "").strip() for text in (inputs or DEFAULT_INPUTS)]
+    samples = []
+    started_at = time.monotonic()
+    warmup_until = started_at + warmup
+    stop_at = warmup_until + duration
+    users = [
+        VirtualUser(base_url, accounts[i % len(accounts)], password, chat_path, inputs, seed + i, timeout)
+        for i in range(concurrency)
+    ]
+    threads = [
+        threading.Thread(target=user.run, args=(mix, started_at, warmup_until, stop_at, samples), daemon=True)
+        for user in users
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize_samples(samples, duration):
+    """엔드포인트별(+전체) 요청 수, RPS, 오류율, 성공 요청의 p50/p95/p99"""
+    report = {}
+    for endpoint in (*ENDPOINTS, "total"):
+        rows = [sample for sample in samples if endpoint == "total" or sample[0] == endpoint]
+        if not rows:
+            continue
+        latencies = [latency for _, _, latency, ok in rows if ok]
+        errors = sum(1 for *_, ok in rows if not ok)
+        report[endpoint] = {
+            "requests": len(rows),
+            "rps": round(len(rows) / duration, 2),
+            "error_rate": round(errors / len(rows), 4),
+            "p50_ms": round(percentile_ms(latencies, 50), 1),
+            "p95_ms": round(percentile_ms(latencies, 95), 1),
+            "p99_ms": round(percentile_ms(latencies, 99), 1),
+        }
+    return report
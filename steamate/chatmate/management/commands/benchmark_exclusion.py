@@ -0,0 +1,76 @@
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from chatmate.utils_v4 import get_vector_store, doc_appid, exclude_candidates, search_candidates, search_excluded
+from chatmate.vector_index import load_collection_embeddings, similarity_search_with_score_by_vector, percentile_ms
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+class Command(BaseCommand):
+    """
+    python manage.py benchmark_exclusion 명령어로 보유 게임 제외 방식별 검색 지연 시간 비교
+    - nin: $nin JSONB 필터 SQL 검색 (기존 방식)
+    - postfilter: 제외 없이 over-fetch 후 set으로 제외, 부족하면 후보 수를 늘려 재검색 (현재 방식)
+    저장된 임베딩을 질의로 사용하므로 OpenAI를 호출하지 않습니다.
+    """
+    help = "Benchmark owned-game exclusion strategies for different Steam library sizes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--library-sizes", type=int_list, default=[10, 1000, 10000])
+        parser.add_argument("--queries", type=int, default=30)
+        parser.add_argument("--k", type=int, default=8)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        store = get_vector_store()
+        rng = np.random.default_rng(options["seed"])
+        k = options["k"]
+
+        vectors = load_collection_embeddings(store)
+        if not len(vectors):
+            raise CommandError("벡터 인덱스가 비어 있습니다.")
+        query_vectors = vectors[rng.integers(0, len(vectors), options["queries"])]
+
+        # 카탈로그에 있는 appid (실제 라이브러리처럼 일부는 검색 결과와 겹치도록)
+        catalog_appids = sorted({
+            doc_appid(doc)
+            for vector in query_vectors
+            for doc, _ in search_candidates(vector)
+        })
+
+        self.stdout.write(f"{'library':>8} {'strategy':>11} {'p50':>9} {'p95':>9} {'results':>8}")
+        for library_size in options["library_sizes"]:
+            owned = set(rng.choice(catalog_appids, min(library_size // 2, len(catalog_appids)), replace=False).tolist())
+            # 나머지는 카탈로그에 없는 게임 (Steam 라이브러리의 대부분)
+            next_appid = 10_000_000
+            while len(owned) < library_size:
+                owned.add(next_appid)
+                next_appid += 1
+
+            for strategy in ("nin", "postfilter"):
+                latencies, counts = [], []
+                for vector in query_vectors:
+                    started_at = time.perf_counter()
+                    if strategy == "nin":
+                        results = similarity_search_with_score_by_vector(
+                            store, vector, k=k, filter={"appid": {"$nin": sorted(owned)}}
+                        )
+                    else:
+                        results = exclude_candidates(search_candidates(vector), owned, k)
+                        if results is None:
+                            results = search_excluded(vector, k, owned)
+                    latencies.append(time.perf_counter() - started_at)
+                    counts.append(len(results))
+                self.stdout.write(
+                    f"{library_size:>8} {strategy:>11} {percentile_ms(latencies, 50):>7.2f}ms "
+                    f"{percentile_ms(latencies, 95):>7.2f}ms {np.mean(counts):>8.1f}"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"fetch_k={settings.CHATMATE_RETRIEVAL_FETCH_K}, max_fetch_k={settings.CHATMATE_RETRIEVAL_MAX_FETCH_K}"
+        ))
@@ -0,0 +1,76 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from chatmate.benchmark import load_inputs, offline_pipeline, run_benchmark
+from chatmate.utils_v4 import PIPELINE_MODES
+
+
+class Command(BaseCommand):
+    """
+    python manage.py benchmark_pipeline 명령어로 챗봇 파이프라인 전체를 오프라인에서 측정
+    - LLM/임베딩: 지연 시간을 설정할 수 있는 결정적 가짜 모델 (OpenAI 호출 없음)
+    - 검색: 가상 카탈로그로 만든 임시 numpy 인덱스 (PGVector 불필요)
+    - 히스토리: 메모리
+    같은 입력 목록을 반복 재생하며 처리량과 단계별 p50/p95/p99를 출력합니다.
+    """
+    help = "Benchmark the chat pipeline offline with fake LLM/embeddings and a local vector index"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--mode", choices=sorted(PIPELINE_MODES), default=None)
+        parser.add_argument("--llm-latency", type=float, default=0.3, help="LLM 호출당 지연 시간 (초)")
+        parser.add_argument("--embedding-latency", type=float, default=0.05, help="임베딩 호출당 지연 시간 (초)")
+        parser.add_argument("--catalog-size", type=int, default=2000)
+        parser.add_argument("--dims", type=int, default=None)
+        parser.add_argument("--inputs", default=None, help="한 줄에 입력 하나인 텍스트 파일 ({title}은 게임 제목으로 치환)")
+        parser.add_argument("--cold", action="store_true", help="요청마다 검색 계획/검색 결과 캐시를 비움")
+        parser.add_argument("--no-title-fast-path", action="store_true")
+        parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests와 --concurrency는 1 이상이어야 합니다.")
+        inputs = load_inputs(options["inputs"])
+        if not inputs:
+            raise CommandError("재생할 입력이 없습니다.")
+
+        # 요청마다 남는 chat_trace 로그는 상세 출력(-v 2)에서만 표시
+        if options["verbosity"] < 2:
+            logging.getLogger("chatmate.metrics").setLevel(logging.WARNING)
+
+        with offline_pipeline(
+            catalog_size=options["catalog_size"],
+            llm_latency=options["llm_latency"],
+            embedding_latency=options["embedding_latency"],
+            dimensions=options["dims"],
+            title_fast_path=not options["no_title_fast_path"],
+            seed=options["seed"],
+        ) as games:
+            report = run_benchmark(
+                inputs,
+                games,
+                requests=options["requests"],
+                concurrency=options["concurrency"],
+                mode=options["mode"],
+                cold=options["cold"],
+                seed=options["seed"],
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(f"{'stage':>22} {'count':>6} {'p50':>10} {'p95':>10} {'p99':>10} {'tokens':>8}")
+        rows = [("request", {**report["request"], "tokens": ""})] + sorted(report["stages"].items())
+        for name, stats in rows:
+            self.stdout.write(
+                f"{name:>22} {stats['count']:>6} {stats['p50_ms']:>8.1f}ms "
+                f"{stats['p95_ms']:>8.1f}ms {stats['p99_ms']:>8.1f}ms {stats['tokens']:>8}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['requests']} requests / {report['seconds']:.2f}s = {report['throughput_rps']:.2f} req/s "
+            f"(concurrency={report['concurrency']})"
+        ))
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from chatmate.neighbors import build_neighbors
+from chatmate.utils_v4 import get_index_version, load_catalog
+
+
+class Command(BaseCommand):
+    """
+    python manage.py build_game_neighbors 명령어로 Game별 유사 게임 상위 K개를 배치 계산
+    - 저장된 임베딩만 사용 (OpenAI 호출 없음), --chunk-size개 게임씩 행렬 곱으로 전체 카탈로그와 비교
+    - 기본은 이웃이 없는 새 게임만 계산하고, 새 게임이 기존 게임의 상위 K개에 들면 기존 목록에 병합
+    - 벡터 인덱스를 다시 만들어 임베딩이 바뀐 뒤에는 --rebuild로 전체 재계산
+    """
+    help = "Precompute top-K similar games for every Game from stored embeddings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=settings.CHATMATE_NEIGHBOR_K, help="게임당 이웃 수")
+        parser.add_argument("--chunk-size", type=int, default=256, help="한 번에 유사도를 계산할 게임 수")
+        parser.add_argument("--rebuild", action="store_true", help="이미 계산된 게임도 다시 계산")
+
+    def handle(self, *args, **options):
+        if options["k"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--k와 --chunk-size는 1 이상이어야 합니다.")
+        started_at = time.perf_counter()
+        try:
+            catalog = load_catalog()
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not len(catalog[0]):
+            raise CommandError("카탈로그 임베딩이 없습니다. 먼저 벡터 인덱스를 만드세요.")
+        computed, missing, updated = build_neighbors(
+            catalog,
+            get_index_version(),
+            k=options["k"],
+            chunk_size=options["chunk_size"],
+            rebuild=options["rebuild"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Computed neighbors for {computed} games, updated {updated} existing games, {missing} without embeddings "
+            f"({len(catalog[0])} catalog games, "
+            f"{time.perf_counter() - started_at:.1f}s)"
+        ))
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from chatmate.snapshots import build_snapshots
+from chatmate.utils_v4 import get_index_version, load_catalog
+
+
+def user_id_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+class Command(BaseCommand):
+    """
+    python manage.py build_recommendation_snapshots 명령어로 유저별 추천 후보를 배치 계산
+    - 유저 프로필(선호 게임 임베딩 평균 + 선호 장르 중심)과 전체 카탈로그의 유사도를 행렬 곱으로 한 번에 계산
+    - 선호 정보 지문과 인덱스 버전이 그대로인 유저는 건너뜀 (--force로 전체 재계산)
+    cron 등으로 주기적으로 실행하면 일반 추천 요청은 HyDE/검색 없이 스냅샷으로 답변합니다.
+    """
+    help = "Precompute per-user recommendation candidates from stored game embeddings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=user_id_list, default=None, help="쉼표로 구분한 유저 id (기본값: 전체)")
+        parser.add_argument("--k", type=int, default=None, help="유저당 후보 수 (기본값: CHATMATE_SNAPSHOT_SIZE)")
+        parser.add_argument("--batch-size", type=int, default=256, help="한 번에 유사도를 계산할 유저 수")
+        parser.add_argument("--force", action="store_true", help="바뀌지 않은 유저도 다시 계산")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or (options["k"] is not None and options["k"] < 1):
+            raise CommandError("--batch-size와 --k는 1 이상이어야 합니다.")
+        started_at = time.perf_counter()
+        try:
+            catalog = load_catalog()
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not len(catalog[0]):
+            raise CommandError("카탈로그 임베딩이 없습니다. 먼저 벡터 인덱스를 만드세요.")
+        saved, skipped = build_snapshots(
+            catalog,
+            get_index_version(),
+            user_ids=options["users"],
+            k=options["k"],
+            batch_size=options["batch_size"],
+            force=options["force"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved {saved} snapshots, skipped {skipped} unchanged ({len(catalog[0])} games, "
+            f"{time.perf_counter() - started_at:.1f}s)"
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from account.models import UserPreferredGame
+from chatmate.models import UserTasteVector
+from chatmate.taste import apply_library_changes
+from chatmate.utils_v4 import get_index_version, load_catalog
+
+
+class Command(BaseCommand):
+    """
+    python manage.py build_taste_vectors 명령어로 취향 벡터가 없거나 이전 벡터 인덱스로 계산된 유저의 취향 벡터 생성
+    이후에는 Steam 라이브러리 가져오기/선호 게임 수정 시 바뀐 게임만 증분 반영되므로 배포 후, 벡터 인덱스를 다시 만든 뒤 실행하면 됩니다.
+    """
+    help = "Build playtime-weighted taste vectors for users without one or with one from an older index"
+
+    def handle(self, *args, **options):
+        try:
+            appids, vectors, _ = load_catalog()
+        except ValueError as e:
+            raise CommandError(str(e))
+        row_of = {int(appid): i for i, appid in enumerate(appids.tolist())}
+        index_version = str(get_index_version())
+
+        def embedding_lookup(appids):
+            return {appid: vectors[row_of[appid]] for appid in appids if appid in row_of}
+
+        libraries = {}
+        stale = Q(user__taste_vector__isnull=True) | ~Q(user__taste_vector__index_version=index_version)
+        rows = UserPreferredGame.objects.filter(stale).values_list("user_id", "game_id", "playtime")
+        for user_id, game_appid, playtime in rows.iterator():
+            libraries.setdefault(user_id, {})[game_appid] = playtime
+
+        created = 0
+        for user_id, library in libraries.items():
+            if apply_library_changes(user_id, library, embedding_lookup, index_version) is not None:
+                created += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Built {created} taste vectors ({UserTasteVector.objects.count()} total, {len(appids)} games)"
+        ))
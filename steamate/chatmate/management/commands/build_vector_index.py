@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from chatmate.ingest import initialize_vectorstore
+from chatmate.utils_v4 import count_vectorstore_documents, get_index_version
+
+
+class Command(BaseCommand):
+    """
+    python manage.py build_vector_index 명령어로 게임 벡터 인덱스를 웹 프로세스 밖에서 생성하고 검증
+    """
+    help = "Build and verify the games_collection PGVector index"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="기존 컬렉션을 삭제하고 다시 생성")
+        parser.add_argument("--probe", action="store_true", help="실제 유사도 검색으로 검증 (임베딩 1회 호출)")
+
+    def handle(self, *args, **options):
+        store, _ = initialize_vectorstore(rebuild=options["rebuild"], log=self.stdout.write)
+
+        documents = count_vectorstore_documents(store)
+        if documents == 0:
+            raise CommandError("벡터 인덱스가 비어 있습니다.")
+        self.stdout.write(f"documents: {documents}")
+        self.stdout.write(f"version: {get_index_version()}")
+
+        if options["probe"]:
+            sample = store.similarity_search("test", k=1)
+            if not sample:
+                raise CommandError("유사도 검색 결과가 없습니다.")
+            self.stdout.write(f"probe: appid {sample[0].metadata.get('appid')}")
+
+        self.stdout.write(self.style.SUCCESS("Vector index is ready!"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from chatmate.numpy_index import publish_numpy_index
+from chatmate.utils_v4 import get_vector_store
+
+
+class Command(BaseCommand):
+    """
+    python manage.py export_vector_index 명령어로 games_collection 임베딩을 메모리 맵 numpy 인덱스로 내보내기
+    실행 중인 워커는 CHATMATE_NUMPY_INDEX_RELOAD_INTERVAL 초 안에 새 인덱스를 읽습니다.
+    """
+    help = "Export games_collection embeddings to the memory-mapped numpy retriever index"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="인덱스 디렉터리 (기본값: CHATMATE_NUMPY_INDEX_DIR)")
+
+    def handle(self, *args, **options):
+        try:
+            version, count = publish_numpy_index(get_vector_store(), index_dir=options["dir"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Published numpy index {version} ({count} games)"))
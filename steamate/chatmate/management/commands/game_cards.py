@@ -0,0 +1,87 @@
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from langchain.schema import Document
+from sqlalchemy.orm import Session
+
+from chatmate.cards import build_game_card, parse_page_content, assemble_context, count_tokens
+from chatmate.utils_v4 import get_vector_store, docs_join_logic, bump_index_version
+
+
+class Command(BaseCommand):
+    """
+    python manage.py game_cards build    : 카드가 없는 기존 문서의 cmetadata에 압축 카드 저장 (임베딩 호출 없음)
+    python manage.py game_cards measure  : 원문 context 대비 카드 context의 프롬프트 토큰 절감량 측정
+    """
+    help = "Build compact game cards for stored documents and measure prompt-token savings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=("build", "measure"))
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--samples", type=int, default=50, help="measure: 측정할 context 수")
+        parser.add_argument("--docs", type=int, default=16, help="measure: context당 문서 수 (검색 결과 최대 개수)")
+        parser.add_argument("--budget", type=int, help="measure: 토큰 예산 (기본값: CHATMATE_CONTEXT_TOKEN_BUDGET)")
+
+    def handle(self, *args, **options):
+        store = get_vector_store()
+        if options["action"] == "build":
+            self.build(store, options["batch_size"])
+        else:
+            self.measure(store, options["samples"], options["docs"], options["budget"])
+
+    def build(self, store, batch_size):
+        updated = 0
+        with Session(store._bind) as session:
+            collection = store.get_collection(session)
+            if collection is None:
+                raise CommandError("Collection not found")
+            while True:
+                rows = session.query(store.EmbeddingStore).filter(
+                    store.EmbeddingStore.collection_id == collection.uuid,
+                    ~store.EmbeddingStore.cmetadata.has_key("card"),
+                ).limit(batch_size).all()
+                if not rows:
+                    break
+                for row in rows:
+                    card = build_game_card(parse_page_content(row.document))
+                    row.cmetadata = {**row.cmetadata, "card": card}
+                session.commit()
+                updated += len(rows)
+                self.stdout.write(f"cards built: {updated}")
+        if updated:
+            # 캐시된 검색 결과에는 카드가 없으므로 무효화
+            bump_index_version(store)
+        self.stdout.write(self.style.SUCCESS(f"Built {updated} game cards"))
+
+    def measure(self, store, samples, docs_per_context, budget):
+        budget = budget or settings.CHATMATE_CONTEXT_TOKEN_BUDGET
+        with Session(store._bind) as session:
+            collection = store.get_collection(session)
+            if collection is None:
+                raise CommandError("Collection not found")
+            rows = session.query(store.EmbeddingStore.document, store.EmbeddingStore.cmetadata).filter(
+                store.EmbeddingStore.collection_id == collection.uuid
+            ).all()
+        if not rows:
+            raise CommandError("벡터 인덱스가 비어 있습니다.")
+
+        documents = [Document(page_content=document, metadata=cmetadata or {}) for document, cmetadata in rows]
+        rng = random.Random(42)
+        raw_tokens, card_tokens, included = [], [], []
+        for _ in range(samples):
+            docs = rng.sample(documents, min(docs_per_context, len(documents)))
+            raw_tokens.append(count_tokens(docs_join_logic(docs)))
+            _, used, tokens = assemble_context(docs, max_tokens=budget)
+            card_tokens.append(tokens)
+            included.append(len(used))
+
+        raw_avg = sum(raw_tokens) / len(raw_tokens)
+        card_avg = sum(card_tokens) / len(card_tokens)
+        self.stdout.write(f"contexts: {samples}, documents per context: {docs_per_context}, budget: {budget}")
+        self.stdout.write(f"raw context tokens (avg/max): {raw_avg:.0f} / {max(raw_tokens)}")
+        self.stdout.write(f"card context tokens (avg/max): {card_avg:.0f} / {max(card_tokens)}")
+        self.stdout.write(f"documents included (avg): {sum(included) / len(included):.1f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Prompt-token savings: {raw_avg - card_avg:.0f} tokens per call ({(1 - card_avg / raw_avg) * 100:.1f}%)"
+        ))
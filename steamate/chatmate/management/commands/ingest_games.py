@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from chatmate.ingest import ingest_csv
+from chatmate.utils_v4 import GAMES_CSV_PATH
+
+
+class Command(BaseCommand):
+    """
+    python manage.py ingest_games 명령어로 게임 CSV를 병렬로 임베딩하여 벡터 스토어에 적재
+    이미 적재된 행(내용 해시 기준)은 건너뛰므로 중단된 경우 다시 실행하면 이어서 적재
+    """
+    help = "Embed games CSV rows into the games_collection vector store (parallel, resumable)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=GAMES_CSV_PATH, help="게임 CSV 경로")
+        parser.add_argument("--batch-size", type=int, default=100, help="임베딩 요청 1회당 행 수")
+        parser.add_argument("--workers", type=int, default=4, help="동시에 실행할 배치 수")
+        parser.add_argument("--rate-limit", type=float, default=0, help="초당 최대 임베딩 요청 수 (0이면 제한 없음)")
+
+    def handle(self, *args, **options):
+        report = ingest_csv(
+            file_path=options["file"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            requests_per_second=options["rate_limit"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(
+            f"rows: {report['rows']}, added: {report['added']}, skipped: {report['skipped']}, "
+            f"tokens: {report['tokens']}, seconds: {report['seconds']:.1f}"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Throughput: {report['rows_per_second']:.1f} rows/s, {report['tokens_per_second']:.1f} tokens/s"
+        ))
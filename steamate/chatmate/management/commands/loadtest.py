@@ -0,0 +1,133 @@
+import json
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from chatmate.benchmark import load_inputs
+from chatmate.loadtest import (WORKER_CONFIGS, delete_accounts, parse_mix, prepare_accounts, prepare_stub_index,
+                               run_load, server_env, start_server, start_stub_backends, stop_server, summarize_samples)
+
+
+def config_list(value):
+    configs = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = set(configs) - set(WORKER_CONFIGS)
+    if unknown:
+        raise ValueError(f"알 수 없는 워커 구성입니다: {', '.join(sorted(unknown))}")
+    return configs
+
+
+class Command(BaseCommand):
+    """
+    python manage.py loadtest 명령어로 gunicorn 워커 구성별 REST API 부하 테스트
+    - OpenAI/Steam: 지연 시간을 설정할 수 있는 로컬 스텁 서버 (외부 호출 없음)
+    - 검색: 가상 카탈로그로 만든 임시 numpy 인덱스
+    - 구성(sync / gthread / asgi / asgi-async)마다 서버를 새로 띄워
+      로그인, 채팅 메시지 생성, 마이페이지 조회를 가중치대로 섞어 보내고
+      엔드포인트별 RPS, 지연 시간 p50/p95/p99, 오류율을 출력합니다.
+    테스트 계정/세션/메시지가 DB에 쓰이므로 전용 DB에서 실행하세요. (스텁 임베딩은 EmbeddingCache에 저장하지 않음)
+    """
+    help = "Load test login/chat/mypage endpoints under sync, gthread and ASGI gunicorn workers with stubbed backends"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--configs", type=config_list, default=list(WORKER_CONFIGS), help="쉼표로 구분한 워커 구성")
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--threads", type=int, default=4, help="gthread 워커당 스레드 수")
+        parser.add_argument("--concurrency", type=int, default=16, help="동시 가상 사용자 수")
+        parser.add_argument("--duration", type=int, default=60, help="측정 시간 (초)")
+        parser.add_argument("--warmup", type=int, default=10, help="집계에서 제외할 시작 구간 (초)")
+        parser.add_argument("--mix", default="login=1,chat=3,mypage=6", help="엔드포인트별 가중치")
+        parser.add_argument("--users", type=int, default=50, help="테스트 계정 수")
+        parser.add_argument("--password", default="loadtest-password-1234")
+        parser.add_argument("--llm-latency", type=float, default=0.8, help="스텁 LLM 호출당 지연 시간 (초)")
+        parser.add_argument("--embedding-latency", type=float, default=0.1)
+        parser.add_argument("--steam-latency", type=float, default=0.15)
+        parser.add_argument("--catalog-size", type=int, default=2000)
+        parser.add_argument("--inputs", default=None, help="한 줄에 채팅 입력 하나인 텍스트 파일")
+        parser.add_argument("--port", type=int, default=8100, help="앱 서버 포트 (스텁은 port + 1)")
+        parser.add_argument("--timeout", type=int, default=120, help="요청 타임아웃 (초)")
+        parser.add_argument("--cleanup", action="store_true", help="끝난 뒤 테스트 계정 삭제")
+        parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+        parser.add_argument("--noinput", "--no-input", action="store_false", dest="interactive")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options["concurrency"] < 1 or options["duration"] < 1:
+            raise CommandError("--concurrency와 --duration은 1 이상이어야 합니다.")
+
+        database = settings.DATABASES["default"]
+        if options["interactive"]:
+            answer = input(
+                f"{database['HOST']}:{database['PORT']}/{database['NAME']} DB에 테스트 계정과 대화 기록을 씁니다. "
+                "계속하려면 'yes'를 입력하세요: "
+            )
+            if answer != "yes":
+                raise CommandError("부하 테스트를 취소했습니다.")
+
+        accounts = prepare_accounts(options["users"], options["password"])
+        inputs = load_inputs(options["inputs"])
+        reports = {}
+
+        with tempfile.TemporaryDirectory(prefix="chatmate-loadtest-") as index_dir:
+            games = prepare_stub_index(index_dir, options["catalog_size"], seed=options["seed"])
+            stub, stub_url = start_stub_backends(
+                options["port"] + 1,
+                games,
+                llm_latency=options["llm_latency"],
+                embedding_latency=options["embedding_latency"],
+                steam_latency=options["steam_latency"],
+            )
+            try:
+                for config in options["configs"]:
+                    self.stderr.write(f"[{config}] 서버 시작 (workers={options['workers']}, threads={options['threads']})")
+                    server, base_url = start_server(
+                        config,
+                        options["port"],
+                        server_env(stub_url, index_dir),
+                        workers=options["workers"],
+                        threads=options["threads"],
+                        timeout=options["timeout"],
+                    )
+                    try:
+                        samples = run_load(
+                            base_url,
+                            accounts,
+                            options["password"],
+                            mix,
+                            chat_path=WORKER_CONFIGS[config][2],
+                            concurrency=options["concurrency"],
+                            duration=options["duration"],
+                            warmup=options["warmup"],
+                            inputs=inputs,
+                            seed=options["seed"],
+                            timeout=options["timeout"],
+                        )
+                    finally:
+                        stop_server(server)
+                    reports[config] = summarize_samples(samples, options["duration"])
+            finally:
+                stub.terminate()
+                stub.join()
+                if options["cleanup"]:
+                    delete_accounts()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(reports, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'config':>10} {'endpoint':>8} {'requests':>8} {'rps':>8} {'errors':>7} {'p50':>10} {'p95':>10} {'p99':>10}"
+        )
+        for config, report in reports.items():
+            for endpoint, stats in report.items():
+                self.stdout.write(
+                    f"{config:>10} {endpoint:>8} {stats['requests']:>8} {stats['rps']:>8.2f} {stats['error_rate']:>7.2%} "
+                    f"{stats['p50_ms']:>8.1f}ms {stats['p95_ms']:>8.1f}ms {stats['p99_ms']:>8.1f}ms"
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"concurrency={options['concurrency']}, duration={options['duration']}s, mix={options['mix']}, "
+            f"llm_latency={options['llm_latency']}s"
+        ))
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from chatmate.utils_v4 import get_vector_store
+from chatmate.vector_index import (INDEX_METHODS, create_ann_index, drop_ann_index,
+                                   ann_index_status, benchmark_ann)
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+class Command(BaseCommand):
+    """
+    python manage.py vector_index <status|create|rebuild|drop|benchmark>
+    games_collection 임베딩 컬럼의 ANN 인덱스(HNSW / IVFFlat) 관리 및 recall/지연 시간 측정
+    """
+    help = "Create, rebuild, drop and benchmark the ANN index on the games_collection embeddings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["status", "create", "rebuild", "drop", "benchmark"])
+        parser.add_argument("--method", choices=INDEX_METHODS, default=settings.CHATMATE_VECTOR_INDEX_METHOD)
+        parser.add_argument("--m", type=int, help="HNSW m")
+        parser.add_argument("--ef-construction", type=int, help="HNSW ef_construction")
+        parser.add_argument("--lists", type=int, help="IVFFlat lists")
+        parser.add_argument("--sizes", type=int_list, default=[1500, 5000, 20000], help="벤치마크 카탈로그 크기 (쉼표 구분)")
+        parser.add_argument("--search-values", type=int_list, default=[], help="벤치마크할 ef_search 또는 probes 값 (쉼표 구분)")
+        parser.add_argument("--k", type=int, default=8)
+        parser.add_argument("--queries", type=int, default=50)
+
+    def handle(self, *args, **options):
+        store = get_vector_store()
+        action = options["action"]
+        index_options = {
+            "m": options["m"],
+            "ef_construction": options["ef_construction"],
+            "lists": options["lists"],
+        }
+
+        if action == "status":
+            index_status = ann_index_status(store)
+            if index_status is None:
+                self.stdout.write("ANN 인덱스가 없습니다. (순차 스캔)")
+            else:
+                self.stdout.write(f"{index_status['definition']} ({index_status['size']})")
+
+        elif action in ("create", "rebuild"):
+            ddl = create_ann_index(store, method=options["method"], **index_options)
+            self.stdout.write(self.style.SUCCESS(f"Created: {ddl}"))
+
+        elif action == "drop":
+            drop_ann_index(store)
+            self.stdout.write(self.style.SUCCESS("ANN index dropped"))
+
+        elif action == "benchmark":
+            try:
+                report = benchmark_ann(
+                    store,
+                    sizes=options["sizes"],
+                    method=options["method"],
+                    k=options["k"],
+                    queries=options["queries"],
+                    search_values=options["search_values"],
+                    **index_options,
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            search_label = "ef_search" if options["method"] == "hnsw" else "probes"
+            self.stdout.write(
+                f"{'size':>8} {search_label:>10} {'recall@' + str(options['k']):>10} "
+                f"{'build_s':>8} {'exact_p50':>10} {'ann_p50':>9} {'ann_p95':>9}"
+            )
+            for row in report:
+                self.stdout.write(
+                    f"{row['size']:>8} {row['search_value']:>10} {row['recall']:>10.3f} "
+                    f"{row['build_seconds']:>8.2f} {row['exact_p50_ms']:>8.2f}ms "
+                    f"{row['ann_p50_ms']:>7.2f}ms {row['ann_p95_ms']:>7.2f}ms"
+                )
@@ -0,0 +1,285 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from langchain_community.callbacks import get_openai_callback
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value):
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += 1
+        series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, count, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._series = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """렌더링 시점에 함수를 호출해 값을 읽는 게이지"""
+
+    def __init__(self, name, help_text, read):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {_format_value(self.read())}"]
+
+
+class MetricsRegistry:
+    """프로세스 내 메트릭 저장소 (Prometheus 텍스트 형식으로 출력)"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, factory, name, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory(name, *args)
+            return metric
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help_text, buckets)
+
+    def counter(self, name, help_text):
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name, help_text, read):
+        return self._get(Gauge, name, help_text, read)
+
+    def observe(self, name, help_text, value, buckets=LATENCY_BUCKETS, **labels):
+        metric = self.histogram(name, help_text, buckets)
+        with self._lock:
+            metric.observe(value, **labels)
+
+    def inc(self, name, help_text, amount=1, **labels):
+        metric = self.counter(name, help_text)
+        with self._lock:
+            metric.inc(amount, **labels)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+            lines = []
+            for metric in metrics:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+_current_trace = contextvars.ContextVar("chatmate_trace", default=None)
+
+
+class Trace:
+    """한 요청의 단계별 소요 시간, 토큰 사용량, 문서 수"""
+
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.stages = []
+        self.started_at = time.perf_counter()
+
+    def add_stage(self, stage, seconds, prompt_tokens=0, completion_tokens=0, documents=None, error=False):
+        self.stages.append({
+            "stage": stage,
+            "ms": round(seconds * 1000, 1),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            **({"documents": documents} if documents is not None else {}),
+            **({"error": True} if error else {}),
+        })
+
+    def finish(self, error=False):
+        seconds = time.perf_counter() - self.started_at
+        prompt_tokens = sum(stage["prompt_tokens"] for stage in self.stages)
+        completion_tokens = sum(stage["completion_tokens"] for stage in self.stages)
+        registry.observe(
+            "chatmate_request_duration_seconds", "Chat request wall time", seconds, endpoint=self.name,
+        )
+        registry.inc(
+            "chatmate_requests_total", "Chat requests", endpoint=self.name, outcome="error" if error else "ok",
+        )
+        logger.info(json.dumps({
+            "event": "chat_trace",
+            "endpoint": self.name,
+            "total_ms": round(seconds * 1000, 1),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "error": error,
+            **self.attrs,
+            "stages": self.stages,
+        }, ensure_ascii=False, default=str))
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def request_trace(name, **attrs):
+    """
+    요청 단위 추적 (이미 추적 중이면 바깥 추적에 합쳐짐)
+    끝나면 구조화 로그 1줄과 요청 히스토그램을 기록합니다.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attrs.update(attrs)
+        yield trace
+        return
+
+    trace = Trace(name, **attrs)
+    # 제너레이터(스트리밍) 안에서도 쓰므로 token 기반 reset 대신 None으로 되돌림
+    _current_trace.set(trace)
+    error = False
+    try:
+        yield trace
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _current_trace.set(None)
+        trace.finish(error=error)
+
+
+def record_stage(stage, seconds, prompt_tokens=0, completion_tokens=0, documents=None, error=False):
+    """단계 측정값을 히스토그램과 현재 요청 추적에 기록 (error: 예외로 끝난 단계)"""
+    registry.observe(
+        "chatmate_stage_duration_seconds", "Pipeline stage wall time", seconds, stage=stage, outcome="error" if error else "ok",
+    )
+    if prompt_tokens or completion_tokens:
+        registry.inc("chatmate_stage_tokens_total", "LLM tokens per pipeline stage", prompt_tokens, stage=stage, kind="prompt")
+        registry.inc("chatmate_stage_tokens_total", "LLM tokens per pipeline stage", completion_tokens, stage=stage, kind="completion")
+    if documents is not None:
+        registry.observe(
+            "chatmate_stage_documents", "Documents produced per pipeline stage", documents, buckets=COUNT_BUCKETS, stage=stage,
+        )
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_stage(stage, seconds, prompt_tokens, completion_tokens, documents, error)
+
+
+def record_cache(cache, hit):
+    """캐시 조회 결과(hit/miss)를 카운터로 기록 (SemanticCache.stats는 프로세스 안에서만 보이므로)"""
+    registry.inc("chatmate_cache_requests_total", "Cache lookups by outcome", cache=cache, outcome="hit" if hit else "miss")
+
+
+@contextmanager
+def stage(name, track_tokens=True):
+    """
+    with stage("hyde") as result: ... 블록의 소요 시간과 (track_tokens면) OpenAI 토큰을 기록
+    result["documents"]에 값을 넣으면 문서 수도 기록합니다.
+    토큰 콜백은 중첩되지 않으므로 토큰을 세는 stage는 서로 겹치지 않게 사용합니다.
+    블록에서 예외가 나도 (LLM 타임아웃 등) outcome="error"로 기록한 뒤 예외를 다시 던집니다.
+    """
+    result = {}
+    started_at = time.perf_counter()
+    tokens = (0, 0)
+    error = False
+    try:
+        if track_tokens:
+            with get_openai_callback() as usage:
+                try:
+                    yield result
+                finally:
+                    tokens = (usage.prompt_tokens, usage.completion_tokens)
+        else:
+            yield result
+    except BaseException:
+        error = True
+        raise
+    finally:
+        record_stage(name, time.perf_counter() - started_at, *tokens, documents=result.get("documents"), error=error)
+
+
+def timed(fn):
+    """fn 결과와 소요 시간(초)을 함께 반환하는 래퍼 (스레드 풀에서 단계별 시간 측정용)"""
+    def wrapper(*args, **kwargs):
+        started_at = time.perf_counter()
+        result = fn(*args, **kwargs)
+        return result, time.perf_counter() - started_at
+    return wrapper
+
+
+def traced(name):
+    """뷰 메서드 전체를 request_trace로 감싸는 데코레이터 (동기/비동기 모두 지원)"""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with request_trace(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with request_trace(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-17 05:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatmate', '0002_embeddingcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatSessionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summary', models.TextField(blank=True)),
+                ('summarized_until', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('session_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='history_summary', to='chatmate.chatsession')),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-17 06:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatmate', '0003_chatsessionsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('status', models.CharField(choices=[('pending', '처리 중'), ('done', '완료')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('chat_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='chatmate.chatmessage')),
+                ('session_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_requests', to='chatmate.chatsession')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatmate', '0004_chatrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatmessage',
+            name='status',
+            field=models.CharField(choices=[('pending', '생성 중'), ('done', '완료'), ('failed', '실패')], default='done', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='chatbot_message',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-17 03:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0013_user_verification_expires_at'),
+        ('chatmate', '0007_usertastevector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('neighbor_appid', models.IntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('index_version', models.CharField(max_length=100)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='account.game')),
+            ],
+            options={
+                'ordering': ['game', 'rank'],
+                'unique_together': {('game', 'rank')},
+            },
+        ),
+    ]
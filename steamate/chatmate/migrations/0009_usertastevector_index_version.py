@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-17 03:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatmate', '0008_gameneighbor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertastevector',
+            name='index_version',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-17 04:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatmate', '0009_usertastevector_index_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='history_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
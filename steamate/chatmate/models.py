@@ -4,10 +4,89 @@ from django.db import models
 class ChatSession(models.Model):
     user_id = models.ForeignKey("account.User", on_delete=models.CASCADE, related_name="chat_sessions")
     created_at = models.DateTimeField(auto_now_add=True)
+    # 히스토리(대화 턴/요약)가 바뀔 때마다 증가 (워커별 히스토리 캐시가 PK 조회 한 번으로 최신인지 확인)
+    history_version = models.PositiveBigIntegerField(default=0)
 
 class ChatMessage(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "생성 중"
+        DONE = "done", "완료"
+        FAILED = "failed", "실패"
+
     session_id = models.ForeignKey("chatmate.ChatSession", on_delete=models.CASCADE, related_name="chat_messages")
     user_message = models.TextField()
-    chatbot_message = models.TextField()
+    chatbot_message = models.TextField(blank=True)
+    # 비동기 작업 모드에서는 pending으로 먼저 저장하고 백그라운드에서 답변을 채움
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.DONE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+class EmbeddingCache(models.Model):
+    """(모델 이름, 텍스트 sha256) 기준 임베딩 영구 캐시 (float32 바이트로 저장)"""
+    model_name = models.CharField(max_length=100)
+    text_hash = models.CharField(max_length=64)
+    vector = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('model_name', 'text_hash')
+
+class ChatSessionSummary(models.Model):
+    """세션의 오래된 대화 턴을 접어 넣은 누적 요약"""
+    session_id = models.OneToOneField("chatmate.ChatSession", on_delete=models.CASCADE, related_name="history_summary")
+    summary = models.TextField(blank=True)
+    # 요약에 반영된 마지막 ChatMessage id (이후 턴만 그대로 프롬프트에 들어감)
+    summarized_until = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+class ChatRequest(models.Model):
+    """중복 대화 요청 병합용 기록 (같은 key의 요청은 한 번만 처리하고 결과를 공유)"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "처리 중"
+        DONE = "done", "완료"
+
+    key = models.CharField(max_length=64, unique=True)
+    session_id = models.ForeignKey("chatmate.ChatSession", on_delete=models.CASCADE, related_name="chat_requests")
+    chat_message = models.ForeignKey("chatmate.ChatMessage", on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
-    modified_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
+    updated_at = models.DateTimeField(auto_now=True)
+
+class RecommendationSnapshot(models.Model):
+    """배치로 미리 계산한 유저별 추천 후보 (선호 정보 지문이 같을 때만 사용)"""
+    user = models.OneToOneField("account.User", on_delete=models.CASCADE, related_name="recommendation_snapshot")
+    # 선호 장르/게임으로 만든 sha256 (바뀌면 스냅샷을 쓰지 않음)
+    fingerprint = models.CharField(max_length=64)
+    # 계산에 사용한 벡터 인덱스 버전
+    index_version = models.CharField(max_length=100)
+    # [{"appid", "score", "card"}] 유사도 내림차순
+    items = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+class UserTasteVector(models.Model):
+    """유저 라이브러리 게임 임베딩의 플레이타임 가중 합 (라이브러리가 바뀔 때마다 증분 갱신)"""
+    user = models.OneToOneField("account.User", on_delete=models.CASCADE, related_name="taste_vector")
+    # 정규화 전 가중 합 (float32 바이트), 방향만 검색 질의 벡터로 사용
+    vector = models.BinaryField(default=bytes)
+    # 합에 반영된 게임별 가중치 {"appid": weight} (제거/플레이타임 변경 시 이전 기여분을 빼기 위해 보관)
+    weights = models.JSONField(default=dict)
+    # 합에 사용한 벡터 인덱스 버전 (인덱스를 다시 만들면 이전 기여분을 뺄 수 없으므로 전체 재계산)
+    index_version = models.CharField(max_length=100, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+class GameNeighbor(models.Model):
+    """게임별 임베딩 코사인 유사도 상위 K개 이웃 (배치 계산, "비슷한 게임" API에서 조회)"""
+    game = models.ForeignKey("account.Game", on_delete=models.CASCADE, related_name="neighbors")
+    # 이웃은 카탈로그 전체에서 고르므로 Game 테이블에 없을 수 있음
+    neighbor_appid = models.IntegerField()
+    title = models.CharField(max_length=255)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    index_version = models.CharField(max_length=100)
+
+    class Meta:
+        # (game, rank) 인덱스로 게임별 이웃을 순서대로 조회
+        unique_together = ('game', 'rank')
+        ordering = ['game', 'rank']
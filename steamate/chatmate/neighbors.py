@@ -0,0 +1,112 @@
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+
+from account.models import Game
+from .cards import document_card
+from .models import GameNeighbor
+from .snapshots import top_k_rows
+
+
+def document_title(doc):
+    """압축 카드의 첫 항목이 게임 제목"""
+    return document_card(doc).split(" | ", 1)[0][:255]
+
+
+def save_neighbors(neighbor_lists, index_version):
+    """{appid: [(점수, 이웃 appid, 제목)] 점수 내림차순}으로 게임별 이웃 목록을 교체"""
+    neighbors = [
+        GameNeighbor(
+            game_id=appid,
+            neighbor_appid=neighbor_appid,
+            title=title,
+            rank=rank,
+            score=score,
+            index_version=str(index_version),
+        )
+        for appid, items in neighbor_lists.items()
+        for rank, (score, neighbor_appid, title) in enumerate(items, start=1)
+    ]
+    with transaction.atomic():
+        GameNeighbor.objects.filter(game_id__in=list(neighbor_lists)).delete()
+        GameNeighbor.objects.bulk_create(neighbors)
+
+
+def merge_new_neighbors(new_appids, existing_appids, catalog, row_of, index_version, k, chunk_size):
+    """
+    새 게임을 이웃이 이미 있는 게임들과 비교해, 기존 K번째 이웃보다 가까우면 그 게임의 이웃 목록에 병합합니다.
+    (chunk_size × 새 게임 수) 유사도 행렬만 만듭니다.
+    반환값: 이웃 목록이 바뀐 기존 게임 수
+    """
+    appids, vectors, documents = catalog
+    new_rows = [row_of[appid] for appid in new_appids]
+    new_vectors = vectors[new_rows]
+    updated = 0
+    for start in range(0, len(existing_appids), chunk_size):
+        chunk = existing_appids[start:start + chunk_size]
+        scores = vectors[[row_of[appid] for appid in chunk]] @ new_vectors.T
+        current = defaultdict(list)
+        rows = GameNeighbor.objects.filter(game_id__in=chunk).values_list("game_id", "score", "neighbor_appid", "title")
+        for game_id, score, neighbor_appid, title in rows:
+            current[game_id].append((score, neighbor_appid, title))
+
+        changed = {}
+        for i, appid in enumerate(chunk):
+            neighbors = current[appid]
+            threshold = min(score for score, _, _ in neighbors) if len(neighbors) >= k else -np.inf
+            known = {neighbor_appid for _, neighbor_appid, _ in neighbors} | {appid}
+            candidates = [
+                (round(float(scores[i, j]), 4), new_appids[j], document_title(documents[new_rows[j]]))
+                for j in np.flatnonzero(scores[i] > threshold).tolist()
+                if new_appids[j] not in known
+            ]
+            if candidates:
+                changed[appid] = sorted(neighbors + candidates, key=lambda item: item[0], reverse=True)[:k]
+        if changed:
+            save_neighbors(changed, index_version)
+            updated += len(changed)
+    return updated
+
+
+def build_neighbors(catalog, index_version, k=10, chunk_size=256, rebuild=False):
+    """
+    Game별 임베딩 유사도 상위 k개 이웃을 계산해 GameNeighbor에 저장합니다.
+    chunk_size개 게임씩 (chunk_size × 카탈로그 크기) 유사도 행렬만 만들어 메모리 사용량을 제한합니다.
+    rebuild가 아니면 이웃이 아직 없는 (새로 추가된) 게임만 계산하고,
+    새 게임이 기존 게임의 상위 k개에 들어가면 기존 게임의 이웃 목록에도 병합합니다.
+    (벡터 인덱스를 다시 만들어 임베딩이 바뀐 뒤에는 rebuild 필요)
+    반환값: (계산한 새 게임 수, 임베딩이 없어 건너뛴 게임 수, 이웃 목록이 바뀐 기존 게임 수)
+    """
+    appids, vectors, documents = catalog
+    vectors = np.asarray(vectors, dtype=np.float32)
+    row_of = {int(appid): i for i, appid in enumerate(appids.tolist())}
+
+    games = Game.objects.all() if rebuild else Game.objects.filter(neighbors__isnull=True)
+    game_ids = list(games.values_list("appid", flat=True).distinct())
+    targets = [appid for appid in game_ids if appid in row_of]
+    existing = [] if rebuild else [
+        appid for appid in Game.objects.filter(neighbors__isnull=False).values_list("appid", flat=True).distinct()
+        if appid in row_of
+    ]
+
+    for start in range(0, len(targets), chunk_size):
+        chunk = targets[start:start + chunk_size]
+        rows = [row_of[appid] for appid in chunk]
+        # 자기 자신은 이웃에서 제외
+        top_rows, top_scores = top_k_rows(vectors[rows], vectors, [[row] for row in rows], k)
+        save_neighbors(
+            {
+                appid: [
+                    (round(float(score), 4), int(appids[row]), document_title(documents[row]))
+                    for row, score in zip(neighbor_rows, neighbor_scores) if np.isfinite(score)
+                ]
+                for appid, neighbor_rows, neighbor_scores in zip(chunk, top_rows.tolist(), top_scores.tolist())
+            },
+            index_version,
+        )
+
+    updated = 0
+    if targets and existing:
+        updated = merge_new_neighbors(targets, existing, (appids, vectors, documents), row_of, index_version, k, chunk_size)
+    return len(targets), len(game_ids) - len(targets), updated
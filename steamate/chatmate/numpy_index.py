@@ -0,0 +1,214 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+from langchain.schema import Document
+from langchain_core.vectorstores import VectorStore
+from sqlalchemy.orm import Session
+
+MANIFEST_NAME = "manifest.json"
+
+
+def publish_numpy_index(store, index_dir=None):
+    """PGVector 컬렉션의 임베딩을 numpy 인덱스로 내보냅니다."""
+    with Session(store._bind) as session:
+        collection = store.get_collection(session)
+        if collection is None:
+            raise ValueError("Collection not found")
+        rows = session.query(
+            store.EmbeddingStore.embedding,
+            store.EmbeddingStore.document,
+            store.EmbeddingStore.cmetadata,
+        ).filter(store.EmbeddingStore.collection_id == collection.uuid).all()
+    if not rows:
+        raise ValueError("벡터 인덱스가 비어 있습니다.")
+    return write_numpy_index(
+        [row[0] for row in rows],
+        [{"page_content": row[1], "metadata": row[2]} for row in rows],
+        index_dir,
+    )
+
+
+def write_numpy_index(embeddings, documents, index_dir=None):
+    """
+    임베딩을 float32 행렬(.npy)로, 문서({"page_content", "metadata"}) 목록을 .json으로 씁니다.
+    파일을 모두 쓴 뒤 manifest.json을 원자적으로 교체하므로 읽는 쪽은 항상 완전한 인덱스를 봅니다.
+    """
+    index_dir = index_dir or settings.CHATMATE_NUMPY_INDEX_DIR
+    os.makedirs(index_dir, exist_ok=True)
+
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    version = uuid.uuid4().hex
+    vectors_name = f"games_{version}.npy"
+    documents_name = f"games_{version}.json"
+    np.save(os.path.join(index_dir, vectors_name), vectors)
+    with open(os.path.join(index_dir, documents_name), "w", encoding="utf-8") as f:
+        json.dump(documents, f, ensure_ascii=False)
+
+    manifest_path = os.path.join(index_dir, MANIFEST_NAME)
+    previous_version = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            previous_version = json.load(f).get("version")
+
+    manifest_tmp = os.path.join(index_dir, f"{MANIFEST_NAME}.{version}.tmp")
+    with open(manifest_tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "vectors": vectors_name, "documents": documents_name, "count": len(documents)}, f)
+    os.replace(manifest_tmp, manifest_path)
+
+    # 직전 버전은 다른 워커가 읽는 중일 수 있으므로 남기고 그 이전 파일만 정리
+    # (이미 열린 mmap은 파일 삭제 후에도 유지됨)
+    keep = {version, previous_version}
+    for name in os.listdir(index_dir):
+        if name.startswith("games_") and not any(v and v in name for v in keep):
+            os.remove(os.path.join(index_dir, name))
+    return version, len(documents)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    메모리 맵 float32 행렬 기반 정확한 top-k 검색
+    - 같은 파일을 mmap으로 열기 때문에 gunicorn 워커 간 페이지 캐시 공유
+    - {"appid": {"$nin": [...]}} 필터는 appid 불리언 마스크로 처리
+    - manifest.json이 바뀌면 다음 검색 시 새 인덱스로 교체
+    PGVector.as_retriever(...) 대신 그대로 사용할 수 있습니다.
+    """
+
+    def __init__(self, embedding_function, index_dir=None, reload_interval=None):
+        self.embedding_function = embedding_function
+        self.index_dir = index_dir or settings.CHATMATE_NUMPY_INDEX_DIR
+        self.reload_interval = (
+            settings.CHATMATE_NUMPY_INDEX_RELOAD_INTERVAL if reload_interval is None else reload_interval
+        )
+        self.version = None
+        self._manifest_mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def embeddings(self):
+        return self.embedding_function
+
+    def _load(self):
+        manifest_path = os.path.join(self.index_dir, MANIFEST_NAME)
+        mtime = os.stat(manifest_path).st_mtime
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        vectors = np.load(os.path.join(self.index_dir, manifest["vectors"]), mmap_mode="r")
+        with open(os.path.join(self.index_dir, manifest["documents"]), encoding="utf-8") as f:
+            documents = json.load(f)
+        appids = np.asarray([int(doc["metadata"].get("appid", -1)) for doc in documents], dtype=np.int64)
+
+        # 검색 중인 스레드가 일관된 상태를 보도록 한 번에 교체
+        self._state = (vectors, documents, appids, {appid: i for i, appid in enumerate(appids.tolist())})
+        self.version = manifest["version"]
+        self._manifest_mtime = mtime
+
+    def reload_if_changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(os.path.join(self.index_dir, MANIFEST_NAME)).st_mtime
+            except FileNotFoundError:
+                return
+            if mtime != self._manifest_mtime:
+                self._load()
+
+    def __len__(self):
+        return len(self._state[1])
+
+    def exclusion_mask(self, exclude_appids):
+        """보유 게임 행은 False인 불리언 마스크"""
+        _, _, appids, row_of = self._state
+        mask = np.ones(len(appids), dtype=bool)
+        rows = [row_of[appid] for appid in exclude_appids if appid in row_of]
+        if rows:
+            mask[rows] = False
+        return mask
+
+    def get_embeddings(self, appids):
+        """appid별 저장된 (정규화된) 임베딩"""
+        self.reload_if_changed()
+        vectors, _, _, row_of = self._state
+        return {int(appid): vectors[row_of[int(appid)]].tolist() for appid in appids if int(appid) in row_of}
+
+    def similarity_search_with_score_by_vector(self, embedding, k=4, filter=None, **kwargs):
+        self.reload_if_changed()
+        vectors, documents, _, _ = self._state
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = vectors @ query
+
+        exclude_appids = ((filter or {}).get("appid") or {}).get("$nin")
+        if exclude_appids:
+            scores = np.where(self.exclusion_mask(int(appid) for appid in exclude_appids), scores, -np.inf)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k else np.array([], dtype=np.int64)
+        top = top[np.argsort(-scores[top])]
+        return [
+            (
+                Document(page_content=documents[i]["page_content"], metadata=documents[i]["metadata"]),
+                # PGVector 코사인 거리와 같은 의미
+                float(1.0 - scores[i]),
+            )
+            for i in top if np.isfinite(scores[i])
+        ]
+
+    def similarity_search_by_vector(self, embedding, k=4, filter=None, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, filter=filter)]
+
+    def similarity_search_with_score(self, query, k=4, filter=None, **kwargs):
+        embedding = self.embedding_function.embed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k=k, filter=filter)
+
+    def similarity_search(self, query, k=4, filter=None, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+    def add_texts(self, texts, metadatas=None, **kwargs):
+        """
+        텍스트를 임베딩해 현재 인덱스 뒤에 붙인 새 버전을 씁니다. (다른 워커는 manifest 교체 후 다시 읽음)
+        전체 파일을 다시 쓰므로 카탈로그 적재는 manage.py export_vector_index를 사용하세요.
+        반환값: 추가된 문서의 행 번호 목록
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        new_vectors = np.asarray(self.embedding_function.embed_documents(texts), dtype=np.float32)
+        with self._lock:
+            vectors, documents, _, _ = self._state
+            start = len(documents)
+            write_numpy_index(
+                np.vstack([vectors, new_vectors]),
+                documents + [{"page_content": text, "metadata": metadata} for text, metadata in zip(texts, metadatas)],
+                self.index_dir,
+            )
+            self._load()
+        return [str(row) for row in range(start, start + len(texts))]
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, index_dir=None, reload_interval=None, **kwargs):
+        """텍스트를 임베딩해 index_dir에 새 인덱스를 쓰고 그 인덱스를 읽는 스토어를 반환합니다."""
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        write_numpy_index(
+            embedding.embed_documents(texts),
+            [{"page_content": text, "metadata": metadata} for text, metadata in zip(texts, metadatas)],
+            index_dir,
+        )
+        return cls(embedding, index_dir=index_dir, reload_interval=reload_interval)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ChatMessage, ChatSession
+from .models import ChatMessage, ChatSession, GameNeighbor
 
 
 class ChatSessionSerializer(serializers.ModelSerializer):
@@ -29,4 +29,12 @@ class ChatMessageSerializer(serializers.ModelSerializer):
         read_only_fields = [
             "chatbot_message",
             "session_id",
-        ]
\ No newline at end of file
+            "status",
+        ]
+
+
+class GameNeighborSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = GameNeighbor
+        fields = ["neighbor_appid", "title", "rank", "score"]
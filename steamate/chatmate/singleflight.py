@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .cache import normalize_text
+from .models import ChatRequest
+
+_cleaned_at = 0.0
+
+
+class RequestInProgress(Exception):
+    """같은 요청이 다른 곳에서 처리 중이고 대기 시간 안에 끝나지 않음 (message_id: 처리 중인 pending 메시지, 없으면 None)"""
+
+    def __init__(self, message_id=None):
+        super().__init__(message_id)
+        self.message_id = message_id
+
+
+def request_key(session_id, user_message, idempotency_key=None, user_id=None):
+    """Idempotency-Key 헤더가 있으면 (유저, 헤더), 없으면 (세션, 정규화된 입력) 기준 키"""
+    if idempotency_key:
+        raw = f"idempotency:{user_id}:{idempotency_key}"
+    else:
+        raw = f"message:{session_id}:{normalize_text(user_message)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_expired(record, now):
+    if record.status == ChatRequest.Status.DONE:
+        return record.chat_message_id is None or record.updated_at < now - timedelta(seconds=settings.CHATMATE_DEDUP_RESULT_TTL)
+    # 처리하던 워커가 죽은 경우
+    return record.created_at < now - timedelta(seconds=settings.CHATMATE_DEDUP_WAIT_TIMEOUT)
+
+
+def claim(key, session):
+    """
+    (ChatRequest, 처음 요청인지) 반환
+    unique key INSERT에 성공한 요청만 실제로 처리하고 나머지는 그 결과를 기다립니다.
+    """
+    while True:
+        try:
+            with transaction.atomic():
+                return ChatRequest.objects.create(key=key, session_id=session), True
+        except IntegrityError:
+            record = ChatRequest.objects.filter(key=key).first()
+            if record is None:
+                continue
+            if is_expired(record, timezone.now()):
+                ChatRequest.objects.filter(pk=record.pk, updated_at=record.updated_at).delete()
+                continue
+            return record, False
+
+
+def complete(record, message):
+    global _cleaned_at
+    record.status = ChatRequest.Status.DONE
+    record.chat_message = message
+    record.save(update_fields=["status", "chat_message", "updated_at"])
+
+    # 오래된 요청 기록 정리 (프로세스당 1분에 한 번)
+    if time.monotonic() - _cleaned_at > 60:
+        _cleaned_at = time.monotonic()
+        ttl = max(settings.CHATMATE_DEDUP_RESULT_TTL, settings.CHATMATE_DEDUP_WAIT_TIMEOUT)
+        ChatRequest.objects.filter(updated_at__lt=timezone.now() - timedelta(seconds=ttl)).delete()
+
+
+def publish(key, message):
+    """처리 중인 요청의 pending ChatMessage를 기록 (기다리다 시간이 지난 요청이 폴링 주소로 돌려받음)"""
+    if settings.CHATMATE_DEDUP_ENABLED:
+        ChatRequest.objects.filter(key=key, status=ChatRequest.Status.PENDING).update(chat_message=message)
+
+
+def in_progress(record):
+    """대기 시간이 지난 요청에 돌려줄 RequestInProgress"""
+    return RequestInProgress(ChatRequest.objects.filter(pk=record.pk).values_list("chat_message_id", flat=True).first())
+
+
+def release(record):
+    """처리 실패 시 기록을 지워 기다리던 요청과 재시도가 다시 처리할 수 있게 함"""
+    ChatRequest.objects.filter(pk=record.pk).delete()
+
+
+def poll(record):
+    """완료되면 ChatMessage, 실패했으면 None, 아직 처리 중이면 False"""
+    record = ChatRequest.objects.filter(pk=record.pk).select_related("chat_message").first()
+    if record is None:
+        return None
+    if record.status == ChatRequest.Status.DONE:
+        return record.chat_message
+    return False
+
+
+def run_once(key, session, produce, wait_timeout=None):
+    """
+    produce()(ChatMessage 반환)를 같은 키에 대해 한 번만 실행합니다.
+    같은 요청은 wait_timeout초(기본 CHATMATE_DEDUP_WAIT_TIMEOUT)까지 결과를 기다리고, 넘으면 RequestInProgress
+    반환값: (ChatMessage, 다른 요청의 결과를 재사용했는지)
+    """
+    if not settings.CHATMATE_DEDUP_ENABLED:
+        return produce(), False
+
+    # 선행 요청이 실패하면 한 번 더 직접 처리를 시도
+    for _ in range(2):
+        record, leader = claim(key, session)
+        if leader:
+            try:
+                message = produce()
+            except Exception:
+                release(record)
+                raise
+            complete(record, message)
+            return message, False
+
+        deadline = time.monotonic() + (settings.CHATMATE_DEDUP_WAIT_TIMEOUT if wait_timeout is None else wait_timeout)
+        result = poll(record)
+        while result is False and time.monotonic() < deadline:
+            time.sleep(settings.CHATMATE_DEDUP_POLL_INTERVAL)
+            result = poll(record)
+        if result:
+            return result, True
+        if result is False:
+            raise in_progress(record)
+    raise RequestInProgress()
+
+
+async def arun_once(key, session, aproduce):
+    """run_once의 비동기 버전 (대기 중 워커를 점유하지 않음)"""
+    if not settings.CHATMATE_DEDUP_ENABLED:
+        return await aproduce(), False
+
+    for _ in range(2):
+        record, leader = await sync_to_async(claim)(key, session)
+        if leader:
+            try:
+                message = await aproduce()
+            except Exception:
+                await sync_to_async(release)(record)
+                raise
+            await sync_to_async(complete)(record, message)
+            return message, False
+
+        deadline = time.monotonic() + settings.CHATMATE_DEDUP_WAIT_TIMEOUT
+        result = await sync_to_async(poll)(record)
+        while result is False and time.monotonic() < deadline:
+            await asyncio.sleep(settings.CHATMATE_DEDUP_POLL_INTERVAL)
+            result = await sync_to_async(poll)(record)
+        if result:
+            return result, True
+        if result is False:
+            raise await sync_to_async(in_progress)(record)
+    raise RequestInProgress()
@@ -0,0 +1,184 @@
+import hashlib
+import re
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from langchain.schema import Document
+
+from account.models import User, UserPreferredGame
+from .cache import canonical_profile, normalize_text
+from .cards import document_card
+from .models import RecommendationSnapshot
+
+# "게임 추천해줘"처럼 선호 정보 외에 조건이 없는 요청에만 나오는 단어
+GENERIC_REQUEST_WORDS = {
+    "게임", "게임을", "게임이", "게임좀", "겜", "추천", "추천해", "추천해줘", "추천해줄래", "추천해주세요", "추천좀",
+    "추천받고", "추천받을", "싶어", "싶어요", "알려줘", "알려주세요", "알려줄래", "아무", "아무거나", "뭐", "뭘", "무슨",
+    "할", "만한", "할만한", "해볼만한", "재밌는", "재미있는", "좋은", "괜찮은", "좀", "하나", "하나만", "몇", "개", "가지",
+    "나", "나한테", "내", "내가", "저", "저한테", "제", "취향", "취향에", "맞는", "있어", "있을까", "없어", "없을까",
+    "해줘", "줘", "주세요", "부탁해", "부탁해요", "요즘", "지금", "오늘", "그냥",
+    "recommend", "recommendation", "suggest", "me", "a", "an", "some", "any", "game", "games", "something",
+    "good", "fun", "please", "what", "should", "i", "play",
+}
+
+
+def is_generic_request(user_input):
+    """선호 장르/게임만으로 답할 수 있는 일반 추천 요청인지 (LLM/임베딩 호출 없음)"""
+    words = re.findall(r"\w+", normalize_text(user_input))
+    return bool(words) and all(word in GENERIC_REQUEST_WORDS for word in words)
+
+
+def preference_fingerprint(genre, appid):
+    """선호 장르 이름 + 선호 게임 appid로 만든 순서 무관 지문"""
+    profile = canonical_profile(genre, [str(game_appid) for game_appid in appid])
+    return hashlib.sha256(profile.encode("utf-8")).hexdigest()
+
+
+def snapshot_documents(items):
+    return [
+        Document(page_content=item["card"], metadata={"appid": item["appid"], "card": item["card"], "score": item["score"]})
+        for item in items
+    ]
+
+
+def get_fresh_snapshot(session_id, genre, appid, index_version):
+    """
+    세션 유저의 스냅샷이 현재 선호 정보/인덱스로 CHATMATE_SNAPSHOT_MAX_AGE 안에 계산된 것이면 후보 문서 목록
+    아니면 None
+    """
+    row = RecommendationSnapshot.objects.filter(user__chat_sessions__id=session_id).values_list(
+        "fingerprint", "index_version", "updated_at", "items"
+    ).first()
+    if row is None:
+        return None
+    fingerprint, snapshot_version, updated_at, items = row
+    if fingerprint != preference_fingerprint(genre, appid) or snapshot_version != str(index_version):
+        return None
+    if updated_at < timezone.now() - timedelta(seconds=settings.CHATMATE_SNAPSHOT_MAX_AGE):
+        return None
+    return snapshot_documents(items) or None
+
+
+def load_user_preferences(user_ids=None):
+    """{user_id: (선호 장르 이름 목록, 선호 게임 appid 목록)} (선호 정보가 없는 유저는 제외)"""
+    genre_rows = User.preferred_genre.through.objects.values_list("user_id", "genre__genre_name")
+    game_rows = UserPreferredGame.objects.values_list("user_id", "game_id")
+    if user_ids is not None:
+        genre_rows = genre_rows.filter(user_id__in=user_ids)
+        game_rows = game_rows.filter(user_id__in=user_ids)
+    preferences = defaultdict(lambda: ([], []))
+    for user_id, genre_name in genre_rows.iterator():
+        preferences[user_id][0].append(genre_name)
+    for user_id, game_appid in game_rows.iterator():
+        preferences[user_id][1].append(game_appid)
+    return dict(preferences)
+
+
+def genre_centroids(documents, vectors):
+    """카탈로그 metadata["genres"]별 평균 임베딩 {정규화된 장르 이름: 단위 벡터}"""
+    rows = defaultdict(list)
+    for i, doc in enumerate(documents):
+        for genre_name in str(doc.metadata.get("genres") or "").split(","):
+            genre_name = normalize_text(genre_name)
+            if genre_name and genre_name != "nan":
+                rows[genre_name].append(i)
+    centroids = {}
+    for genre_name, indices in rows.items():
+        centroid = vectors[indices].mean(axis=0)
+        centroids[genre_name] = centroid / (np.linalg.norm(centroid) or 1.0)
+    return centroids
+
+
+def build_profile(genre, appid, vectors, row_of, centroids, genre_weight):
+    """선호 게임 임베딩 평균 + genre_weight × 선호 장르 중심 평균 (계산할 수 없으면 None)"""
+    game_rows = [row_of[game_appid] for game_appid in appid if game_appid in row_of]
+    genre_vectors = [centroids[key] for key in (normalize_text(name) for name in genre) if key in centroids]
+    profile = np.zeros(vectors.shape[1], dtype=np.float32)
+    if game_rows:
+        profile += vectors[game_rows].mean(axis=0)
+    if genre_vectors:
+        profile += genre_weight * np.mean(genre_vectors, axis=0)
+    norm = np.linalg.norm(profile)
+    return profile / norm if norm else None
+
+
+def top_k_rows(profiles, vectors, exclude_rows, k):
+    """
+    profiles(m×d)와 카탈로그(n×d)의 코사인 유사도 상위 k개 (행, 점수)
+    exclude_rows[i]는 i번째 프로필에서 제외할 카탈로그 행
+    """
+    scores = profiles @ vectors.T
+    for i, rows in enumerate(exclude_rows):
+        if rows:
+            scores[i, rows] = -np.inf
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def build_snapshots(catalog, index_version, user_ids=None, k=None, batch_size=256, genre_weight=None, force=False):
+    """
+    전체(또는 user_ids) 유저의 추천 스냅샷을 계산해 저장합니다.
+    force가 아니면 지문과 인덱스 버전이 그대로인 유저는 건너뜁니다.
+    반환값: (저장한 유저 수, 건너뛴 유저 수)
+    """
+    appids, vectors, documents = catalog
+    k = k or settings.CHATMATE_SNAPSHOT_SIZE
+    genre_weight = settings.CHATMATE_SNAPSHOT_GENRE_WEIGHT if genre_weight is None else genre_weight
+    vectors = np.asarray(vectors, dtype=np.float32)
+    row_of = {int(appid): i for i, appid in enumerate(appids.tolist())}
+    centroids = genre_centroids(documents, vectors)
+
+    preferences = load_user_preferences(user_ids)
+    fingerprints = {user_id: preference_fingerprint(genre, appid) for user_id, (genre, appid) in preferences.items()}
+    if not force:
+        current = RecommendationSnapshot.objects.filter(
+            user_id__in=list(fingerprints), index_version=str(index_version)
+        ).values_list("user_id", "fingerprint")
+        unchanged = {user_id for user_id, fingerprint in current if fingerprints.get(user_id) == fingerprint}
+    else:
+        unchanged = set()
+    targets = [user_id for user_id in preferences if user_id not in unchanged]
+
+    saved = 0
+    for start in range(0, len(targets), batch_size):
+        batch, profiles, exclude_rows = [], [], []
+        for user_id in targets[start:start + batch_size]:
+            genre, appid = preferences[user_id]
+            profile = build_profile(genre, appid, vectors, row_of, centroids, genre_weight)
+            if profile is None:
+                continue
+            batch.append(user_id)
+            profiles.append(profile)
+            # 이미 보유/선호하는 게임은 추천 후보에서 제외
+            exclude_rows.append([row_of[game_appid] for game_appid in appid if game_appid in row_of])
+        if not batch:
+            continue
+
+        top_rows, top_scores = top_k_rows(np.stack(profiles), vectors, exclude_rows, k)
+        snapshots = [
+            RecommendationSnapshot(
+                user_id=user_id,
+                fingerprint=fingerprints[user_id],
+                index_version=str(index_version),
+                items=[
+                    {"appid": int(appids[row]), "score": round(float(score), 4), "card": document_card(documents[row])}
+                    for row, score in zip(rows.tolist(), scores.tolist()) if np.isfinite(score)
+                ],
+                updated_at=timezone.now(),
+            )
+            for user_id, rows, scores in zip(batch, top_rows, top_scores)
+        ]
+        RecommendationSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["fingerprint", "index_version", "items", "updated_at"],
+        )
+        saved += len(snapshots)
+    return saved, len(unchanged)
@@ -0,0 +1,84 @@
+import hashlib
+import math
+
+import numpy as np
+from django.db import transaction
+
+from account.models import UserPreferredGame
+from .models import UserTasteVector
+
+
+def playtime_weight(playtime):
+    """
+    플레이타임(분) → 가중치
+    직접 고른 게임(플레이타임 0)도 1을 주고, 오래 한 게임이 지나치게 지배하지 않도록 시간 단위 log 스케일 사용
+    """
+    return 1.0 + math.log1p(max(playtime or 0, 0) / 60)
+
+
+def library_changes(before, after):
+    """
+    라이브러리 변경분 {appid: 플레이타임 (제거된 게임은 None)}
+    before/after: {appid: 플레이타임}
+    """
+    changes = {appid: None for appid in before if appid not in after}
+    changes.update({appid: playtime for appid, playtime in after.items() if before.get(appid) != playtime})
+    return changes
+
+
+def apply_library_changes(user_id, changes, embedding_lookup, index_version):
+    """
+    바뀐 게임의 기여분만 빼고 더해 취향 벡터를 갱신합니다. (전체 재계산 없음)
+    changes: library_changes 결과, embedding_lookup: appid 목록 → {appid: 저장된 게임 임베딩}
+    저장된 벡터가 다른 인덱스 버전으로 계산됐으면 이전 기여분을 뺄 수 없으므로 현재 라이브러리 전체로 다시 계산합니다.
+    임베딩이 없는 게임은 반영하지 않습니다.
+    """
+    index_version = str(index_version)
+    with transaction.atomic():
+        taste, _ = UserTasteVector.objects.select_for_update().get_or_create(
+            user_id=user_id, defaults={"index_version": index_version}
+        )
+        weights = dict(taste.weights)
+        total = np.frombuffer(bytes(taste.vector), dtype=np.float32).astype(np.float64)
+        if taste.index_version != index_version:
+            weights, total = {}, np.zeros(0)
+            changes = dict(UserPreferredGame.objects.filter(user_id=user_id).values_list("game_id", "playtime"))
+
+        game_vectors = embedding_lookup(list(changes)) if changes else {}
+        for appid, playtime in changes.items():
+            appid = int(appid)
+            if appid not in game_vectors:
+                continue
+            vector = np.asarray(game_vectors[appid], dtype=np.float64)
+            vector /= np.linalg.norm(vector) or 1.0
+            if not total.size:
+                total = np.zeros_like(vector)
+            old_weight = weights.pop(str(appid), 0.0)
+            new_weight = playtime_weight(playtime) if playtime is not None else 0.0
+            total += (new_weight - old_weight) * vector
+            if new_weight:
+                weights[str(appid)] = new_weight
+
+        # 모든 게임이 빠지면 누적 오차 없이 0부터 다시 시작
+        taste.vector = (total if weights else np.zeros_like(total)).astype(np.float32).tobytes()
+        taste.weights = weights
+        taste.index_version = index_version
+        taste.save()
+    return taste
+
+
+def get_session_taste(session_id, index_version):
+    """
+    세션 유저의 정규화된 취향 벡터와 벡터 내용 해시 (검색 결과 캐시 키용)
+    취향 벡터가 없거나 다른 인덱스 버전으로 계산됐으면 None
+    """
+    row = UserTasteVector.objects.filter(user__chat_sessions__id=session_id).values_list(
+        "vector", "weights", "index_version"
+    ).first()
+    if row is None or not row[1] or row[2] != str(index_version):
+        return None
+    vector = np.frombuffer(bytes(row[0]), dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if not norm:
+        return None
+    return (vector / norm).tolist(), hashlib.sha256(bytes(row[0])).hexdigest()[:16]
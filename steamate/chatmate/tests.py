@@ -1,3 +1,564 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.management import call_command
+from django.db.models import F
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+from langchain.schema import Document
+from rest_framework.test import APIClient
+
+from account.models import Game, User, UserPreferredGame
+from . import singleflight
+from .benchmark import FakeEmbeddings
+from .cache import CachedEmbeddings, SemanticCache
+from .history import LocalHistoryStore, PostgresHistoryStore, SessionTurns
+from .metrics import record_cache, registry, request_trace, stage
+from .models import ChatMessage, ChatRequest, ChatSession, GameNeighbor, UserTasteVector
+from .numpy_index import NumpyVectorStore, write_numpy_index
+from .snapshots import is_generic_request, top_k_rows
+from .taste import apply_library_changes, library_changes, playtime_weight
+from .title_matcher import AhoCorasick, TitleMatcher
+from .utils_v4 import exclude_candidates, merge_results, plan_queries, search_excluded
+from .views import metrics_view
+
+
+# DB를 쓰지 않는 단위 테스트는 SimpleTestCase로 작성 (DB 쿼리가 생기면 실패)
+
+class BenchmarkPipelineTests(SimpleTestCase):
+
+    def run_benchmark(self, inputs):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", encoding="utf-8", delete=False) as f:
+            f.write("\n".join(inputs))
+        self.addCleanup(os.remove, f.name)
+        out = io.StringIO()
+        call_command(
+            "benchmark_pipeline", inputs=f.name, requests=4, concurrency=2, llm_latency=0, embedding_latency=0,
+            catalog_size=50, json=True, stdout=out,
+        )
+        return json.loads(out.getvalue())
+
+    def test_generic_input_runs_offline(self):
+        # 일반 추천 요청도 스냅샷/취향 벡터 DB 조회 없이 검색 파이프라인을 탐
+        report = self.run_benchmark(["게임 추천해줘"])
+        self.assertEqual(report["requests"], 4)
+        self.assertNotIn("snapshot", report["stages"])
+        self.assertNotIn("taste", report["stages"])
+        self.assertIn("retrieval", report["stages"])
+
+
+class MetricsViewTests(SimpleTestCase):
+
+    def get(self, **headers):
+        return metrics_view(RequestFactory().get("/metrics", headers=headers))
+
+    def test_disabled_without_token(self):
+        with self.settings(CHATMATE_METRICS_TOKEN=""):
+            self.assertEqual(self.get().status_code, 404)
+
+    def test_requires_bearer_token(self):
+        with self.settings(CHATMATE_METRICS_TOKEN="secret"):
+            self.assertEqual(self.get().status_code, 401)
+            self.assertEqual(self.get(Authorization="Bearer wrong").status_code, 401)
+            response = self.get(Authorization="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+
+class StageTests(SimpleTestCase):
+
+    def test_failed_stage_is_recorded(self):
+        with self.assertRaises(TimeoutError):
+            with request_trace("test_stage") as trace:
+                with stage("flaky_llm", track_tokens=False):
+                    raise TimeoutError()
+        self.assertEqual(trace.stages[0]["stage"], "flaky_llm")
+        self.assertTrue(trace.stages[0]["error"])
+        self.assertIn('chatmate_stage_duration_seconds_count{outcome="error",stage="flaky_llm"}', registry.render())
+
+    def test_successful_stage_records_documents(self):
+        with request_trace("test_stage") as trace:
+            with stage("lookup", track_tokens=False) as result:
+                result["documents"] = 3
+        self.assertEqual(trace.stages[0]["documents"], 3)
+        self.assertNotIn("error", trace.stages[0])
+
+    def test_cache_lookups_are_counted(self):
+        record_cache("test_cache", True)
+        record_cache("test_cache", False)
+        record_cache("test_cache", False)
+        output = registry.render()
+        self.assertIn('chatmate_cache_requests_total{cache="test_cache",outcome="hit"} 1.0', output)
+        self.assertIn('chatmate_cache_requests_total{cache="test_cache",outcome="miss"} 2.0', output)
+
+
+class CachedEmbeddingsTests(SimpleTestCase):
+
+    def test_without_persist_uses_memory_only(self):
+        # SimpleTestCase는 DB 쿼리를 막으므로 EmbeddingCache에 접근하면 실패
+        underlying = FakeEmbeddings(dimensions=8)
+        cached = CachedEmbeddings(underlying, model_name="fake", persist=False)
+        first = cached.embed_documents(["a", "b", "a"])
+        self.assertEqual(first[0], first[2])
+        self.assertEqual(cached.embed_query("b"), first[1])
+
+
+def doc(appid):
+    return Document(page_content=f"game {appid}", metadata={"appid": appid})
+
+
+class MergeResultsTests(SimpleTestCase):
+
+    def test_merge_results_keeps_closest_per_appid(self):
+        merged = merge_results([
+            [(doc(1), 0.3), (doc(2), 0.1)],
+            [(doc(1), 0.05), (doc(3), 0.2)],
+        ])
+        self.assertEqual([d.metadata["appid"] for d in merged], [1, 2, 3])
+
+
+class SemanticCacheTests(SimpleTestCase):
+
+    def test_hit_above_threshold_only(self):
+        cache = SemanticCache(maxsize=10, ttl=60, threshold=0.9)
+        cache.set([1.0, 0.0], "rpg", "plan")
+        self.assertEqual(cache.get([0.99, 0.05], "rpg"), "plan")
+        self.assertIsNone(cache.get([0.5, 0.5], "rpg"))
+        # profile이 다르면 벡터가 같아도 미스
+        self.assertIsNone(cache.get([1.0, 0.0], "fps"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_expired_entry_is_removed(self):
+        cache = SemanticCache(maxsize=10, ttl=60, threshold=0.9)
+        with mock.patch("chatmate.cache.time.monotonic", return_value=1000.0):
+            cache.set([1.0, 0.0], "rpg", "plan")
+        with mock.patch("chatmate.cache.time.monotonic", return_value=1059.0):
+            self.assertEqual(cache.get([1.0, 0.0], "rpg"), "plan")
+        with mock.patch("chatmate.cache.time.monotonic", return_value=1061.0):
+            self.assertIsNone(cache.get([1.0, 0.0], "rpg"))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SemanticCache(maxsize=2, ttl=60, threshold=0.9)
+        cache.set([1.0, 0.0], "p", "a")
+        cache.set([0.0, 1.0], "p", "b")
+        cache.get([1.0, 0.0], "p")
+        cache.set([-1.0, 0.0], "p", "c")
+        self.assertEqual(cache.get([1.0, 0.0], "p"), "a")
+        self.assertIsNone(cache.get([0.0, 1.0], "p"))
+
+
+class PlanQueriesTests(SimpleTestCase):
+
+    def test_plan_cache_vector_is_reused_as_first_query(self):
+        queries, vectors = plan_queries("  RPG 추천해줘! ", ["open world", "story rich"], [0.6, 0.8])
+        self.assertEqual(queries, ["rpg 추천해줘", "open world", "story rich"])
+        self.assertEqual(vectors, {0: [0.6, 0.8]})
+
+    def test_without_plan_cache_vector(self):
+        self.assertEqual(plan_queries("RPG 추천해줘", ["open world"], None), (["open world"], None))
+
+
+class ExcludeCandidatesTests(SimpleTestCase):
+
+    def test_exclude_candidates_skips_owned_games(self):
+        candidates = [(doc(appid), appid / 10) for appid in range(1, 6)]
+        with self.settings(CHATMATE_RETRIEVAL_FETCH_K=5):
+            results = exclude_candidates(candidates, {1, 3}, 2)
+        self.assertEqual([d.metadata["appid"] for d, _ in results], [2, 4])
+
+    def test_exclude_candidates_needs_search_when_exhausted(self):
+        candidates = [(doc(appid), appid / 10) for appid in range(1, 6)]
+        with self.settings(CHATMATE_RETRIEVAL_FETCH_K=5):
+            self.assertIsNone(exclude_candidates(candidates, {1, 2, 3, 4}, 2))
+        # 후보가 fetch_k보다 적으면 카탈로그 전체를 본 것이므로 있는 만큼 반환
+        with self.settings(CHATMATE_RETRIEVAL_FETCH_K=32):
+            self.assertEqual(len(exclude_candidates(candidates, {1, 2, 3, 4}, 2)), 1)
+
+
+class SearchExcludedTests(SimpleTestCase):
+    """appid 순서대로 가까운 카탈로그에 대해 HNSW처럼 ef_search개까지만 반환하는 가짜 pgvector 검색"""
+
+    def setUp(self):
+        self.calls = []
+
+    def fake_search(self, catalog_size):
+        def search(store, vector, k=4, filter=None, ef_search=None, probes=None, exact=False):
+            self.calls.append({"k": k, "ef_search": ef_search, "exact": exact})
+            rows = range(catalog_size) if exact else range(min(catalog_size, ef_search or 40))
+            excluded = set(((filter or {}).get("appid") or {}).get("$nin") or [])
+            return [(doc(appid), appid / catalog_size) for appid in rows if appid not in excluded][:k]
+        return search
+
+    def search(self, catalog_size, owned, k=5):
+        with mock.patch("chatmate.utils_v4.get_vector_store"), \
+                mock.patch("chatmate.utils_v4.similarity_search_with_score_by_vector", self.fake_search(catalog_size)), \
+                self.settings(CHATMATE_RETRIEVER_BACKEND="pgvector", CHATMATE_RETRIEVAL_FETCH_K=32,
+                              CHATMATE_RETRIEVAL_MAX_FETCH_K=2048, CHATMATE_HNSW_EF_SEARCH=40):
+            return [d.metadata["appid"] for d, _ in search_excluded([1.0, 0.0], k, owned)]
+
+    def test_large_library_falls_back_to_exact_search(self):
+        # 가장 가까운 1500개를 모두 보유 → ef_search 상한(1000)까지 늘려도 부족
+        self.assertEqual(self.search(3000, set(range(1500))), [1500, 1501, 1502, 1503, 1504])
+        ann_calls = [call for call in self.calls if not call["exact"]]
+        self.assertEqual([call["k"] for call in ann_calls], [128, 512, 1000])
+        self.assertTrue(all(call["ef_search"] <= 1000 for call in ann_calls))
+        self.assertTrue(self.calls[-1]["exact"])
+
+    def test_small_library_needs_no_exact_search(self):
+        self.assertEqual(self.search(3000, set(range(200))), [200, 201, 202, 203, 204])
+        self.assertFalse(any(call["exact"] for call in self.calls))
+
+    def test_exhausted_catalog_returns_remaining_games(self):
+        self.assertEqual(self.search(100, set(range(98))), [98, 99])
+
+
+class NumpyVectorStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        vectors = [[1.0, 0.0], [0.9, 0.1], [0.7, 0.3], [0.0, 1.0]]
+        write_numpy_index(vectors, [{"page_content": f"game {i}", "metadata": {"appid": 100 + i}} for i in range(4)], index_dir.name)
+        self.index_dir = index_dir.name
+        self.store = NumpyVectorStore(FakeEmbeddings(dimensions=2), index_dir=index_dir.name, reload_interval=3600)
+
+    def appids(self, results):
+        return [d.metadata["appid"] for d, _ in results]
+
+    def test_search_orders_by_distance(self):
+        results = self.store.similarity_search_with_score_by_vector([1.0, 0.0], k=3)
+        self.assertEqual(self.appids(results), [100, 101, 102])
+        self.assertAlmostEqual(results[0][1], 0.0, places=5)
+
+    def test_nin_filter_masks_excluded_games(self):
+        results = self.store.similarity_search_with_score_by_vector(
+            [1.0, 0.0], k=2, filter={"appid": {"$nin": ["100", 102, 999]}}
+        )
+        self.assertEqual(self.appids(results), [101, 103])
+        # 남은 게임보다 k가 크면 제외한 게임을 채우지 않음
+        results = self.store.similarity_search_with_score_by_vector(
+            [1.0, 0.0], k=4, filter={"appid": {"$nin": [100, 101, 102]}}
+        )
+        self.assertEqual(self.appids(results), [103])
+
+    def test_add_texts_writes_new_version(self):
+        version = self.store.version
+        embedding = FakeEmbeddings(dimensions=8)
+        store = NumpyVectorStore.from_texts(
+            ["space strategy", "farm life"], embedding, [{"appid": 1}, {"appid": 2}], index_dir=self.index_dir
+        )
+        self.assertEqual(store.add_texts(["space shooter"], [{"appid": 3}]), ["2"])
+        self.assertNotEqual(store.version, version)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.similarity_search("space shooter", k=1)[0].metadata["appid"], 3)
+        # 다른 프로세스도 manifest로 같은 인덱스를 읽음
+        self.assertEqual(len(NumpyVectorStore(embedding, index_dir=self.index_dir)), 3)
+
+
+class TitleMatcherTests(SimpleTestCase):
+
+    def make_matcher(self, games):
+        matcher = TitleMatcher()
+        matcher.build(games)
+        # DB 지문 확인을 건너뜀
+        matcher._dirty = False
+        matcher._checked_at = time.monotonic()
+        return matcher
+
+    def test_aho_corasick_finds_overlapping_patterns(self):
+        automaton = AhoCorasick(["he", "she", "hers"])
+        matches = sorted(automaton.iter_matches("ushers"))
+        self.assertEqual(matches, [(1, 4, 1), (2, 4, 0), (2, 6, 2)])
+
+    def test_longest_title_wins_and_word_boundaries(self):
+        matcher = self.make_matcher([(1, "Dark Souls"), (3, "Dark Souls III"), (10, "Portal"), (20, "엘든 링")])
+        self.assertEqual(matcher.find("Dark Souls III 같은 게임"), [3])
+        self.assertEqual(matcher.find("엘든 링이랑 portal 둘 다 좋아"), [20, 10])
+        # 영문 제목은 단어 중간에서 매칭하지 않음
+        self.assertEqual(matcher.find("portals and teleporting"), [])
+
+    def test_short_titles_are_ignored(self):
+        with self.settings(CHATMATE_TITLE_MIN_LENGTH=3):
+            matcher = self.make_matcher([(1, "Go"), (2, "Hades")])
+        self.assertEqual(matcher.find("go play hades"), [2])
+
+
+class HistoryStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        self.store = LocalHistoryStore(window_turns=4, summary_batch=2, cache_size=10)
+        self.store._sessions[1] = SessionTurns([(10, "q1", "a1"), (11, "q2", "a2"), (12, "q3", "a3")], None)
+
+    def contents(self):
+        return [message.content for message in self.store.load(1)]
+
+    def test_remove_turn_by_message_id(self):
+        self.assertTrue(self.store.remove_turn(1, 11))
+        self.assertEqual(self.contents(), ["q1", "a1", "q3", "a3"])
+        # 이미 없는 (또는 요약에 접힌) 턴
+        self.assertFalse(self.store.remove_turn(1, 11))
+
+    def test_forget_turn_updates_cache(self):
+        self.store.forget_turn(1, 10)
+        self.assertEqual(self.contents(), ["q2", "a2", "q3", "a3"])
+        # 캐시가 없는 세션은 무시
+        self.store.forget_turn(2, 10)
+        self.assertNotIn(2, self.store._sessions)
+
+
+class SnapshotTests(SimpleTestCase):
+
+    def test_is_generic_request(self):
+        self.assertTrue(is_generic_request("게임 추천해줘!"))
+        self.assertTrue(is_generic_request("recommend me some games"))
+        self.assertFalse(is_generic_request("공포 게임 추천해줘"))
+        self.assertFalse(is_generic_request("   "))
+
+    def test_top_k_rows_excludes_rows(self):
+        vectors = np.eye(4, dtype=np.float32)
+        profiles = np.asarray([[0.9, 0.5, 0.1, 0.0], [0.0, 0.0, 0.2, 1.0]], dtype=np.float32)
+        rows, scores = top_k_rows(profiles, vectors, [[0], []], 2)
+        self.assertEqual(rows.tolist(), [[1, 2], [3, 2]])
+        self.assertAlmostEqual(float(scores[0, 0]), 0.5, places=5)
+
+
+class LibraryChangesTests(SimpleTestCase):
+
+    def test_library_changes(self):
+        before = {1: 0, 2: 60, 3: 120}
+        after = {2: 60, 3: 600, 4: 0}
+        self.assertEqual(library_changes(before, after), {1: None, 3: 600, 4: 0})
+        self.assertEqual(library_changes(after, after), {})
+
+    def test_playtime_weight(self):
+        self.assertEqual(playtime_weight(0), 1.0)
+        self.assertEqual(playtime_weight(None), 1.0)
+        self.assertLess(playtime_weight(60), playtime_weight(600))
+
+
+# DB가 필요한 테스트
+
+def make_user(username="tester"):
+    return User.objects.create(
+        username=username, email=f"{username}@example.com", nickname=username, birth=datetime.date(2000, 1, 1)
+    )
+
+
+class TitleMatcherRefreshTests(TestCase):
+
+    def test_title_edited_elsewhere_triggers_rebuild(self):
+        Game.objects.create(appid=1, title="Hollow Knight", genre="action")
+        matcher = TitleMatcher()
+        with self.settings(CHATMATE_TITLE_MATCHER_CHECK_INTERVAL=0):
+            self.assertEqual(matcher.find("hollow knight 같은 게임"), [1])
+            # 다른 워커의 수정은 이 프로세스의 시그널(mark_dirty)을 거치지 않음
+            Game.objects.filter(appid=1).update(title="Silksong", modified_at=timezone.now() + timedelta(seconds=1))
+            self.assertEqual(matcher.find("silksong 같은 게임"), [1])
+            self.assertEqual(matcher.find("hollow knight 같은 게임"), [])
+
+
+class GameNeighborAPITests(TestCase):
+
+    def setUp(self):
+        Game.objects.create(appid=1, title="Hollow Knight", genre="action")
+        GameNeighbor.objects.bulk_create([
+            GameNeighbor(game_id=1, neighbor_appid=100 + rank, title=f"game {rank}", rank=rank, score=1 - rank / 100, index_version="v1")
+            for rank in range(1, 6)
+        ])
+
+    def ranks(self, query=""):
+        response = self.client.get(f"/api/v1/chat/games/1/similar/{query}")
+        self.assertEqual(response.status_code, 200)
+        return [neighbor["rank"] for neighbor in response.json()["data"]]
+
+    def test_limit_is_capped_at_stored_k(self):
+        with self.settings(CHATMATE_NEIGHBOR_K=3):
+            self.assertEqual(self.ranks("?limit=1000000"), [1, 2, 3])
+            self.assertEqual(self.ranks(), [1, 2, 3])
+            self.assertEqual(self.ranks("?limit=0"), [1])
+
+    def test_non_integer_limit_is_rejected(self):
+        self.assertEqual(self.client.get("/api/v1/chat/games/1/similar/?limit=all").status_code, 400)
+
+
+class PostgresHistoryStoreTests(TestCase):
+
+    def setUp(self):
+        self.session = ChatSession.objects.create(user_id=make_user())
+        self.store = PostgresHistoryStore(window_turns=4, summary_batch=2, cache_size=10)
+        self.history = mock.patch("chatmate.history.get_history_store", return_value=self.store)
+        self.history.start()
+        self.addCleanup(self.history.stop)
+
+    def save(self, user_message):
+        return ChatMessage.objects.create(session_id=self.session, user_message=user_message, chatbot_message="a")
+
+    def contents(self):
+        return [message.content for message in self.store.load(self.session.id)]
+
+    def test_cache_hit_costs_one_primary_key_lookup(self):
+        self.save("q1")
+        self.contents()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.contents(), ["q1", "a"])
+        # 이 프로세스의 저장은 시그널로 캐시와 버전을 함께 갱신
+        self.save("q2")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.contents(), ["q1", "a", "q2", "a"])
+
+    def test_change_from_another_worker_is_read(self):
+        message = self.save("q1")
+        self.contents()
+        # 다른 워커의 수정 (이 프로세스의 캐시를 거치지 않음)
+        ChatMessage.objects.filter(pk=message.pk).update(user_message="edited")
+        ChatSession.objects.filter(pk=self.session.pk).update(history_version=F("history_version") + 1)
+        self.assertEqual(self.contents(), ["edited", "a"])
+
+    def test_record_change_invalidates_every_worker(self):
+        message = self.save("q1")
+        self.contents()
+        ChatMessage.objects.filter(pk=message.pk).update(user_message="edited")
+        other_worker = PostgresHistoryStore(window_turns=4, summary_batch=2, cache_size=10)
+        other_worker.load(self.session.id)
+        self.store.record_change(self.session.id)
+        self.assertEqual(self.contents(), ["edited", "a"])
+        self.assertNotEqual(other_worker._sessions[self.session.id].fingerprint, other_worker._fingerprint(self.session.id))
+
+
+class SingleflightTests(TestCase):
+
+    def setUp(self):
+        self.session = ChatSession.objects.create(user_id=make_user())
+
+    def test_only_first_claim_leads(self):
+        record, leader = singleflight.claim("key", self.session)
+        waiter, waiter_leads = singleflight.claim("key", self.session)
+        self.assertTrue(leader)
+        self.assertFalse(waiter_leads)
+        self.assertEqual(waiter.pk, record.pk)
+
+    def test_poll_follows_leader(self):
+        record, _ = singleflight.claim("key", self.session)
+        self.assertIs(singleflight.poll(record), False)
+        message = ChatMessage.objects.create(session_id=self.session, user_message="q", chatbot_message="a")
+        singleflight.complete(record, message)
+        self.assertEqual(singleflight.poll(record), message)
+
+    def test_released_claim_returns_none(self):
+        record, _ = singleflight.claim("key", self.session)
+        singleflight.release(record)
+        self.assertIsNone(singleflight.poll(record))
+        self.assertTrue(singleflight.claim("key", self.session)[1])
+
+    def test_follower_timeout_carries_published_message(self):
+        record, _ = singleflight.claim("key", self.session)
+        message = ChatMessage.objects.create(
+            session_id=self.session, user_message="q", chatbot_message="", status=ChatMessage.Status.PENDING
+        )
+        singleflight.publish("key", message)
+        with self.assertRaises(singleflight.RequestInProgress) as raised:
+            singleflight.run_once("key", self.session, mock.Mock(), wait_timeout=0)
+        self.assertEqual(raised.exception.message_id, message.id)
+        self.assertIs(singleflight.poll(record), False)
+
+    def test_stale_claim_is_taken_over(self):
+        record, _ = singleflight.claim("key", self.session)
+        ChatRequest.objects.filter(pk=record.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        with self.settings(CHATMATE_DEDUP_WAIT_TIMEOUT=60):
+            new_record, leader = singleflight.claim("key", self.session)
+        self.assertTrue(leader)
+        self.assertNotEqual(new_record.pk, record.pk)
+
+
+class SyncFollowerTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user()
+        self.session = ChatSession.objects.create(user_id=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.key = singleflight.request_key(self.session.id, "q", "retry-1", self.user.id)
+        self.record, _ = singleflight.claim(self.key, self.session)
+
+    def post(self):
+        with mock.patch("chatmate.views.chatbot_call") as chatbot_call, self.settings(CHATMATE_DEDUP_SYNC_WAIT_TIMEOUT=0):
+            response = self.client.post(
+                f"/api/v1/chat/{self.session.id}/message/", {"user_message": "q"}, format="json", HTTP_IDEMPOTENCY_KEY="retry-1",
+            )
+        chatbot_call.assert_not_called()
+        return response
+
+    def test_follower_returns_poll_url_of_leader_message(self):
+        message = ChatMessage.objects.create(
+            session_id=self.session, user_message="q", chatbot_message="", status=ChatMessage.Status.PENDING
+        )
+        singleflight.publish(self.key, message)
+        response = self.post()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Location"], f"/api/v1/chat/{self.session.id}/message/{message.id}/")
+
+    def test_follower_without_leader_message_conflicts(self):
+        self.assertEqual(self.post().status_code, 409)
+
+    def test_leader_fills_pending_message(self):
+        with mock.patch("chatmate.views.chatbot_call", return_value="a"):
+            response = self.client.post(f"/api/v1/chat/{self.session.id}/message/", {"user_message": "q2"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        message = ChatMessage.objects.get(user_message="q2")
+        self.assertEqual((message.chatbot_message, message.status), ("a", ChatMessage.Status.DONE))
+        self.assertEqual(ChatRequest.objects.get(chat_message=message).status, ChatRequest.Status.DONE)
+
+    def test_failed_leader_leaves_no_message(self):
+        with mock.patch("chatmate.views.chatbot_call", side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            self.client.post(f"/api/v1/chat/{self.session.id}/message/", {"user_message": "q2"}, format="json")
+        self.assertFalse(ChatMessage.objects.filter(user_message="q2").exists())
+
+
+class TasteVectorTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user()
+        self.vectors = {appid: np.eye(3)[i] * (i + 2) for i, appid in enumerate([1, 2, 3])}
+        for appid in self.vectors:
+            Game.objects.create(appid=appid, title=f"game {appid}", genre="rpg")
+
+    def lookup(self, appids):
+        return {appid: self.vectors[appid] for appid in appids if appid in self.vectors}
+
+    def stored(self):
+        taste = UserTasteVector.objects.get(user=self.user)
+        return np.frombuffer(bytes(taste.vector), dtype=np.float32), taste
+
+    def test_incremental_update(self):
+        apply_library_changes(self.user.id, {1: 0, 2: 60, 99: 0}, self.lookup, "v1")
+        apply_library_changes(self.user.id, library_changes({1: 0, 2: 60}, {2: 600, 3: 0}), self.lookup, "v1")
+        vector, taste = self.stored()
+        np.testing.assert_allclose(vector, [0.0, playtime_weight(600), 1.0], rtol=1e-6)
+        self.assertEqual(set(taste.weights), {"2", "3"})
+
+    def test_removing_every_game_resets_vector(self):
+        apply_library_changes(self.user.id, {1: 0}, self.lookup, "v1")
+        apply_library_changes(self.user.id, {1: None}, self.lookup, "v1")
+        vector, taste = self.stored()
+        self.assertFalse(vector.any())
+        self.assertEqual(taste.weights, {})
+
+    def test_new_index_version_rebuilds_from_library(self):
+        apply_library_changes(self.user.id, {1: 0, 2: 0}, self.lookup, "v1")
+        UserPreferredGame.objects.create(user=self.user, game_id=2, playtime=0)
+        UserPreferredGame.objects.create(user=self.user, game_id=3, playtime=0)
+        # 인덱스가 바뀌면 변경분이 아니라 현재 라이브러리 전체로 다시 계산
+        self.vectors = {appid: -vector for appid, vector in self.vectors.items()}
+        apply_library_changes(self.user.id, {3: 0}, self.lookup, "v2")
+        vector, taste = self.stored()
+        np.testing.assert_allclose(vector, [0.0, -1.0, -1.0], rtol=1e-6)
+        self.assertEqual(taste.index_version, "v2")
@@ -0,0 +1,138 @@
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.db.models.signals import post_save, post_delete
+
+from account.models import Game
+
+
+def normalize_title(text):
+    """소문자 변환 후 문자/숫자 외 기호를 공백 하나로 정리"""
+    return re.sub(r"[\W_]+", " ", str(text).lower()).strip()
+
+
+def _is_ascii_alnum(char):
+    return char.isascii() and char.isalnum()
+
+
+class AhoCorasick:
+    """여러 패턴을 입력 길이에 비례하는 시간에 한 번에 찾는 오토마타"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.lengths = []
+        for pattern_id, pattern in enumerate(patterns):
+            self.lengths.append(len(pattern))
+            node = 0
+            for char in pattern:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.output[node].append(pattern_id)
+
+        # BFS로 실패 링크 연결
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def iter_matches(self, text):
+        """(start, end, pattern_id) 를 yield"""
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for pattern_id in self.output[node]:
+                yield i + 1 - self.lengths[pattern_id], i + 1, pattern_id
+
+
+class TitleMatcher:
+    """
+    account.Game 제목 사전으로 사용자 입력에 언급된 게임을 찾습니다.
+    - Game 저장/삭제 시그널로 같은 프로세스에서는 즉시, 다른 워커는
+      CHATMATE_TITLE_MATCHER_CHECK_INTERVAL 초마다 (개수, 최대 appid, 마지막 수정 시각) 지문을 비교해 다시 만듭니다.
+    - 영문/숫자 제목은 단어 중간에서 매칭되지 않도록 경계 확인 (한글 조사는 허용)
+    """
+
+    def __init__(self):
+        self._automaton = None
+        self._appids = []
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._dirty = True
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, **kwargs):
+        self._dirty = True
+
+    def _current_fingerprint(self):
+        # 제목 수정은 개수/appid를 바꾸지 않으므로 마지막 수정 시각도 비교
+        stats = Game.objects.aggregate(count=Count("appid"), max_appid=Max("appid"), modified_at=Max("modified_at"))
+        return stats["count"], stats["max_appid"], stats["modified_at"]
+
+    def build(self, games):
+        """(appid, title) 목록으로 오토마타 생성"""
+        titles = {}
+        for appid, title in games:
+            normalized = normalize_title(title)
+            if len(normalized) >= settings.CHATMATE_TITLE_MIN_LENGTH:
+                titles.setdefault(normalized, appid)
+        # 검색 중인 스레드가 일관된 상태를 보도록 한 번에 교체
+        self._automaton, self._appids = AhoCorasick(list(titles.keys())), list(titles.values())
+
+    def _rebuild(self, fingerprint):
+        self.build(Game.objects.values_list("appid", "title"))
+        self._fingerprint = fingerprint
+        self._dirty = False
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if not self._dirty and now - self._checked_at < settings.CHATMATE_TITLE_MATCHER_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = now
+            fingerprint = self._current_fingerprint()
+            if self._dirty or fingerprint != self._fingerprint:
+                self._rebuild(fingerprint)
+
+    def find(self, text):
+        """입력에 언급된 게임 appid 목록 (겹치면 긴 제목 우선, 등장 순서)"""
+        self.ensure_fresh()
+        text = normalize_title(text)
+        automaton, appids = self._automaton, self._appids
+
+        matches = []
+        for start, end, pattern_id in automaton.iter_matches(text):
+            if start > 0 and _is_ascii_alnum(text[start - 1]) and _is_ascii_alnum(text[start]):
+                continue
+            if end < len(text) and _is_ascii_alnum(text[end]) and _is_ascii_alnum(text[end - 1]):
+                continue
+            matches.append((start, end, pattern_id))
+
+        found, covered_until = [], -1
+        for start, end, pattern_id in sorted(matches, key=lambda match: (match[0], -(match[1] - match[0]))):
+            if start >= covered_until:
+                found.append(appids[pattern_id])
+                covered_until = end
+        return found
+
+
+title_matcher = TitleMatcher()
+post_save.connect(title_matcher.mark_dirty, sender=Game, dispatch_uid="chatmate_title_matcher_save")
+post_delete.connect(title_matcher.mark_dirty, sender=Game, dispatch_uid="chatmate_title_matcher_delete")
@@ -1,10 +1,22 @@
 from django.urls import path
-from .views import ChatSessionAPIView, ChatMessageAPIView
+from django.views.decorators.csrf import csrf_exempt
+from .views import (ChatSessionAPIView, ChatMessageAPIView, ChatMessageStreamAPIView,
+                    AsyncChatMessageView, AsyncChatMessageStreamView, AsyncChatMessageWaitView, VectorIndexReadyAPIView,
+                    GameNeighborAPIView)
 
 
 urlpatterns = [
     path('', ChatSessionAPIView.as_view()),
+    path('ready/', VectorIndexReadyAPIView.as_view()),
+    # 미리 계산된 비슷한 게임 (읽기 전용)
+    path('games/<int:appid>/similar/', GameNeighborAPIView.as_view()),
     path('<int:session_id>/', ChatSessionAPIView.as_view()),
     path('<int:session_id>/message/', ChatMessageAPIView.as_view()),
-    path('<int:session_id>/message/<int:message_id>/', ChatMessageAPIView.as_view())
+    path('<int:session_id>/message/stream/', ChatMessageStreamAPIView.as_view()),
+    # ASGI 비동기 엔드포인트 (JWT 인증이므로 CSRF 제외)
+    path('<int:session_id>/message/async/', csrf_exempt(AsyncChatMessageView.as_view())),
+    path('<int:session_id>/message/async/stream/', csrf_exempt(AsyncChatMessageStreamView.as_view())),
+    path('<int:session_id>/message/<int:message_id>/', ChatMessageAPIView.as_view()),
+    # 비동기 작업(Prefer: respond-async) 완료 롱 폴링
+    path('<int:session_id>/message/<int:message_id>/wait/', csrf_exempt(AsyncChatMessageWaitView.as_view())),
 ]
\ No newline at end of file
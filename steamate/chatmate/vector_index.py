@@ -0,0 +1,221 @@
+import time
+
+import numpy as np
+import sqlalchemy
+from django.conf import settings
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+EMBEDDING_TABLE = "langchain_pg_embedding"
+ANN_INDEX_NAME = "ix_langchain_pg_embedding_ann"
+INDEX_METHODS = ("hnsw", "ivfflat")
+HNSW_MAX_EF_SEARCH = 1000  # pgvector hnsw.ef_search 최대값
+
+
+def apply_search_settings(session, ef_search=None, probes=None):
+    """현재 트랜잭션에만 적용되는 ANN 검색 파라미터 설정"""
+    ef_search = ef_search or settings.CHATMATE_HNSW_EF_SEARCH
+    probes = probes or settings.CHATMATE_IVFFLAT_PROBES
+    session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+    session.execute(text(f"SET LOCAL ivfflat.probes = {int(probes)}"))
+
+
+def similarity_search_with_score_by_vector(store, embedding, k=4, filter=None, ef_search=None, probes=None, exact=False):
+    """
+    PGVector.similarity_search_with_score_by_vector와 같은 결과를 반환하되
+    질의마다 hnsw.ef_search / ivfflat.probes 값을 지정할 수 있습니다.
+    exact: ANN 인덱스를 쓰지 않고 필터를 먼저 적용한 정확 검색
+    (ANN 인덱스는 ef_search/probes 범위의 후보에만 필터를 적용하므로 k개보다 적게 반환될 수 있음)
+    """
+    with Session(store._bind) as session:
+        apply_search_settings(session, ef_search, probes)
+        if exact:
+            session.execute(text("SET LOCAL enable_indexscan = off"))
+        collection = store.get_collection(session)
+        if not collection:
+            raise ValueError("Collection not found")
+
+        filter_by = [store.EmbeddingStore.collection_id == collection.uuid]
+        if filter:
+            filter_clause = store._create_filter_clause(filter)
+            if filter_clause is not None:
+                filter_by.append(filter_clause)
+
+        results = (
+            session.query(
+                store.EmbeddingStore,
+                store.distance_strategy(embedding).label("distance"),
+            )
+            .filter(*filter_by)
+            .order_by(sqlalchemy.asc("distance"))
+            .limit(k)
+            .all()
+        )
+    return store._results_to_docs_and_scores(results)
+
+
+def index_ddl(method, table, name, m=None, ef_construction=None, lists=None):
+    """코사인 거리용 ANN 인덱스 생성 SQL"""
+    if method == "hnsw":
+        m = m or settings.CHATMATE_HNSW_M
+        ef_construction = ef_construction or settings.CHATMATE_HNSW_EF_CONSTRUCTION
+        options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+    elif method == "ivfflat":
+        options = f"lists = {int(lists or settings.CHATMATE_IVFFLAT_LISTS)}"
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 방식입니다: {method}")
+    return f"CREATE INDEX {name} ON {table} USING {method} (embedding vector_cosine_ops) WITH ({options})"
+
+
+def ensure_embedding_dimensions(session, dimensions=None):
+    """
+    ANN 인덱스는 차원이 고정된 vector 컬럼에만 만들 수 있으므로
+    langchain이 차원 없이 만든 embedding 컬럼을 vector(dimensions)로 변경합니다.
+    """
+    dimensions = int(dimensions or settings.CHATMATE_EMBEDDING_DIMENSIONS)
+    current = session.execute(text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = CAST(:table AS regclass) AND attname = 'embedding'"
+    ), {"table": EMBEDDING_TABLE}).scalar()
+    if current != f"vector({dimensions})":
+        session.execute(text(
+            f"ALTER TABLE {EMBEDDING_TABLE} ALTER COLUMN embedding TYPE vector({dimensions})"
+        ))
+
+
+def create_ann_index(store, method=None, m=None, ef_construction=None, lists=None):
+    """games_collection 임베딩 컬럼에 ANN 인덱스를 생성 (이미 있으면 교체)"""
+    method = method or settings.CHATMATE_VECTOR_INDEX_METHOD
+    ddl = index_ddl(method, EMBEDDING_TABLE, ANN_INDEX_NAME, m=m, ef_construction=ef_construction, lists=lists)
+    with Session(store._bind) as session:
+        ensure_embedding_dimensions(session)
+        session.execute(text(f"DROP INDEX IF EXISTS {ANN_INDEX_NAME}"))
+        session.execute(text(ddl))
+        session.commit()
+    return ddl
+
+
+def drop_ann_index(store):
+    with Session(store._bind) as session:
+        session.execute(text(f"DROP INDEX IF EXISTS {ANN_INDEX_NAME}"))
+        session.commit()
+
+
+def ann_index_status(store):
+    """현재 ANN 인덱스 정의와 크기 (없으면 None)"""
+    with Session(store._bind) as session:
+        row = session.execute(text(
+            "SELECT indexdef, pg_size_pretty(pg_relation_size(CAST(indexname AS regclass))) "
+            "FROM pg_indexes WHERE indexname = :name"
+        ), {"name": ANN_INDEX_NAME}).first()
+    if row is None:
+        return None
+    return {"definition": row[0], "size": row[1]}
+
+
+def load_collection_embeddings(store):
+    with Session(store._bind) as session:
+        collection = store.get_collection(session)
+        if collection is None:
+            return np.zeros((0, settings.CHATMATE_EMBEDDING_DIMENSIONS), dtype=np.float32)
+        rows = session.query(store.EmbeddingStore.embedding).filter(
+            store.EmbeddingStore.collection_id == collection.uuid
+        ).all()
+    return np.asarray([row[0] for row in rows], dtype=np.float32)
+
+
+def synthesize_catalog(base, size, rng, noise=0.05):
+    """
+    size가 실제 카탈로그보다 크면 기존 임베딩에 잡음을 더해 가상 게임을 만듭니다.
+    (카탈로그 증가 시의 recall/지연 시간 추정용)
+    """
+    if size <= len(base):
+        vectors = base[:size]
+    else:
+        picks = rng.integers(0, len(base), size - len(base))
+        extra = base[picks] + rng.normal(0, noise, (len(picks), base.shape[1])).astype(np.float32)
+        vectors = np.vstack([base, extra])
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000) if samples else 0.0
+
+
+def benchmark_ann(store, sizes, method=None, k=8, queries=50, search_values=(), m=None, ef_construction=None, lists=None, seed=42):
+    """
+    카탈로그 크기별로 임시 테이블에 ANN 인덱스를 만들고
+    정확 검색(numpy) 대비 recall@k와 질의 지연 시간을 측정합니다.
+    search_values: hnsw면 ef_search, ivfflat이면 probes 후보 값
+    """
+    method = method or settings.CHATMATE_VECTOR_INDEX_METHOD
+    rng = np.random.default_rng(seed)
+    base = load_collection_embeddings(store)
+    if not len(base):
+        raise ValueError("벡터 인덱스가 비어 있습니다.")
+    dimensions = base.shape[1]
+    default_value = settings.CHATMATE_HNSW_EF_SEARCH if method == "hnsw" else settings.CHATMATE_IVFFLAT_PROBES
+    search_values = list(search_values) or [default_value]
+    report = []
+
+    for size in sizes:
+        vectors = synthesize_catalog(base, size, rng)
+        picks = rng.integers(0, len(vectors), queries)
+        query_vectors = vectors[picks] + rng.normal(0, 0.02, (queries, dimensions)).astype(np.float32)
+        query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+        # 정답: 코사인 유사도 기준 정확한 top-k
+        exact = np.argsort(-(query_vectors @ vectors.T), axis=1)[:, :k]
+
+        with Session(store._bind) as session:
+            session.execute(text(
+                f"CREATE TEMP TABLE ann_benchmark (id integer, embedding vector({dimensions})) ON COMMIT DROP"
+            ))
+            session.execute(
+                text("INSERT INTO ann_benchmark (id, embedding) VALUES (:id, CAST(:embedding AS vector))"),
+                [{"id": i, "embedding": str(vector.tolist())} for i, vector in enumerate(vectors)],
+            )
+            search_sql = text(
+                "SELECT id FROM ann_benchmark ORDER BY embedding <=> CAST(:embedding AS vector) LIMIT :k"
+            )
+
+            def run_queries():
+                latencies, found = [], []
+                for vector in query_vectors:
+                    started_at = time.perf_counter()
+                    rows = session.execute(search_sql, {"embedding": str(vector.tolist()), "k": k}).all()
+                    latencies.append(time.perf_counter() - started_at)
+                    found.append([row[0] for row in rows])
+                return latencies, found
+
+            # 인덱스 없는 정확 검색 (순차 스캔) 지연 시간
+            exact_latencies, _ = run_queries()
+
+            started_at = time.perf_counter()
+            session.execute(text(index_ddl(method, "ann_benchmark", "ix_ann_benchmark", m=m, ef_construction=ef_construction, lists=lists)))
+            build_seconds = time.perf_counter() - started_at
+            session.execute(text("ANALYZE ann_benchmark"))
+            # 작은 테이블에서도 인덱스를 사용하도록 순차 스캔 비활성화
+            session.execute(text("SET LOCAL enable_seqscan = off"))
+
+            for value in search_values:
+                if method == "hnsw":
+                    apply_search_settings(session, ef_search=value)
+                else:
+                    apply_search_settings(session, probes=value)
+                latencies, found = run_queries()
+                recall = np.mean([
+                    len(set(result) & set(truth.tolist())) / k for result, truth in zip(found, exact)
+                ])
+                report.append({
+                    "size": size,
+                    "method": method,
+                    "search_value": value,
+                    "recall": float(recall),
+                    "build_seconds": build_seconds,
+                    "exact_p50_ms": percentile_ms(exact_latencies, 50),
+                    "ann_p50_ms": percentile_ms(latencies, 50),
+                    "ann_p95_ms": percentile_ms(latencies, 95),
+                })
+            session.rollback()
+
+    return report
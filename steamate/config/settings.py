@@ -15,6 +15,7 @@ from dotenv import load_dotenv
 import os
 from datetime import timedelta
 from django.core.exceptions import ImproperlyConfigured
+from corsheaders.defaults import default_headers
 
 load_dotenv()
 
@@ -75,6 +76,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# 중복 요청 병합용 Idempotency-Key 헤더 허용
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key", "prefer")
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -193,6 +197,103 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 
 
+# 챗봇 파이프라인 모드 (staged: HyDE → 질의어 분해 → 답변, single: 구조화 검색 계획 → 답변)
+# 요청 본문의 pipeline_mode 값으로 요청별 지정 가능
+CHATMATE_PIPELINE_MODE = os.getenv("CHATMATE_PIPELINE_MODE", "staged")
+
+# 검색 계획(HyDE + 질의어 분해) 시맨틱 캐시
+CHATMATE_PLAN_CACHE_ENABLED = os.getenv("CHATMATE_PLAN_CACHE_ENABLED", "True") == "True"
+CHATMATE_PLAN_CACHE_SIZE = int(os.getenv("CHATMATE_PLAN_CACHE_SIZE", "1000"))
+CHATMATE_PLAN_CACHE_TTL = int(os.getenv("CHATMATE_PLAN_CACHE_TTL", "3600"))  # 초
+CHATMATE_PLAN_CACHE_THRESHOLD = float(os.getenv("CHATMATE_PLAN_CACHE_THRESHOLD", "0.95"))  # 코사인 유사도
+
+# 임베딩 Postgres 캐시(EmbeddingCache) 사용 여부 (스텁 임베딩으로 띄우는 부하 테스트 서버는 False)
+CHATMATE_EMBEDDING_CACHE_PERSIST = os.getenv("CHATMATE_EMBEDDING_CACHE_PERSIST", "True") == "True"
+
+# 검색 결과 캐시 (보유 게임 제외 전 후보를 FETCH_K개까지 저장)
+CHATMATE_RETRIEVAL_CACHE_SIZE = int(os.getenv("CHATMATE_RETRIEVAL_CACHE_SIZE", "2000"))
+CHATMATE_RETRIEVAL_CACHE_TTL = int(os.getenv("CHATMATE_RETRIEVAL_CACHE_TTL", "86400"))  # 초
+CHATMATE_RETRIEVAL_FETCH_K = int(os.getenv("CHATMATE_RETRIEVAL_FETCH_K", "32"))
+CHATMATE_RETRIEVAL_MAX_FETCH_K = int(os.getenv("CHATMATE_RETRIEVAL_MAX_FETCH_K", "2048"))  # 보유 게임 제외 시 최대 over-fetch
+CHATMATE_INDEX_VERSION_CHECK_INTERVAL = int(os.getenv("CHATMATE_INDEX_VERSION_CHECK_INTERVAL", "30"))  # 초
+
+# 벡터 ANN 인덱스 (manage.py vector_index 로 생성/재생성/벤치마크)
+CHATMATE_EMBEDDING_DIMENSIONS = int(os.getenv("CHATMATE_EMBEDDING_DIMENSIONS", "1536"))
+CHATMATE_VECTOR_INDEX_METHOD = os.getenv("CHATMATE_VECTOR_INDEX_METHOD", "hnsw")  # hnsw / ivfflat
+CHATMATE_HNSW_M = int(os.getenv("CHATMATE_HNSW_M", "16"))
+CHATMATE_HNSW_EF_CONSTRUCTION = int(os.getenv("CHATMATE_HNSW_EF_CONSTRUCTION", "64"))
+CHATMATE_HNSW_EF_SEARCH = int(os.getenv("CHATMATE_HNSW_EF_SEARCH", "40"))
+CHATMATE_IVFFLAT_LISTS = int(os.getenv("CHATMATE_IVFFLAT_LISTS", "100"))
+CHATMATE_IVFFLAT_PROBES = int(os.getenv("CHATMATE_IVFFLAT_PROBES", "10"))
+
+# 검색 백엔드 (pgvector: Postgres 검색, numpy: manage.py export_vector_index 로 내보낸 메모리 맵 인덱스)
+CHATMATE_RETRIEVER_BACKEND = os.getenv("CHATMATE_RETRIEVER_BACKEND", "pgvector")
+CHATMATE_NUMPY_INDEX_DIR = os.getenv("CHATMATE_NUMPY_INDEX_DIR", str(BASE_DIR / "vector_index"))
+CHATMATE_NUMPY_INDEX_RELOAD_INTERVAL = int(os.getenv("CHATMATE_NUMPY_INDEX_RELOAD_INTERVAL", "30"))  # 초
+
+# 게임 제목 언급 fast path ("X 같은 게임 추천해줘" → X의 임베딩으로 바로 검색)
+CHATMATE_TITLE_FAST_PATH_ENABLED = os.getenv("CHATMATE_TITLE_FAST_PATH_ENABLED", "True") == "True"
+CHATMATE_TITLE_MIN_LENGTH = int(os.getenv("CHATMATE_TITLE_MIN_LENGTH", "3"))  # 정규화 후 최소 제목 길이
+CHATMATE_TITLE_MATCHER_CHECK_INTERVAL = int(os.getenv("CHATMATE_TITLE_MATCHER_CHECK_INTERVAL", "60"))  # 초
+
+# 게임별 유사 게임 (manage.py build_game_neighbors 로 게임당 K개 저장, 조회 API의 limit 상한)
+CHATMATE_NEIGHBOR_K = int(os.getenv("CHATMATE_NEIGHBOR_K", "10"))
+
+# 답변 프롬프트 context (게임 압축 카드) 설정
+CHATMATE_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHATMATE_CONTEXT_TOKEN_BUDGET", "1500"))
+CHATMATE_CARD_SUMMARY_CHARS = int(os.getenv("CHATMATE_CARD_SUMMARY_CHARS", "200"))
+
+# 대화 히스토리 저장소 (postgres: 워커 간 공유, local: 프로세스 내 캐시만)
+CHATMATE_HISTORY_BACKEND = os.getenv("CHATMATE_HISTORY_BACKEND", "postgres")
+CHATMATE_HISTORY_MAX_TURNS = int(os.getenv("CHATMATE_HISTORY_MAX_TURNS", "6"))  # 그대로 프롬프트에 넣을 최근 턴 수
+CHATMATE_HISTORY_SUMMARY_BATCH = int(os.getenv("CHATMATE_HISTORY_SUMMARY_BATCH", "4"))  # 한 번에 요약으로 접을 턴 수
+CHATMATE_HISTORY_SUMMARY_MODEL = os.getenv("CHATMATE_HISTORY_SUMMARY_MODEL", "gpt-4o-mini")
+CHATMATE_HISTORY_SUMMARY_MAX_CHARS = int(os.getenv("CHATMATE_HISTORY_SUMMARY_MAX_CHARS", "600"))
+
+# 중복 대화 요청 병합 (재시도/더블 클릭)
+CHATMATE_DEDUP_ENABLED = os.getenv("CHATMATE_DEDUP_ENABLED", "True") == "True"
+CHATMATE_DEDUP_RESULT_TTL = int(os.getenv("CHATMATE_DEDUP_RESULT_TTL", "30"))  # 완료 후 같은 결과를 돌려줄 시간 (초)
+CHATMATE_DEDUP_WAIT_TIMEOUT = int(os.getenv("CHATMATE_DEDUP_WAIT_TIMEOUT", "120"))  # 처리 중인 요청을 기다릴 최대 시간 (초, 비동기 API)
+CHATMATE_DEDUP_SYNC_WAIT_TIMEOUT = int(os.getenv("CHATMATE_DEDUP_SYNC_WAIT_TIMEOUT", "3"))  # 동기 API가 워커를 점유하며 기다릴 최대 시간 (초, 지나면 202 + 폴링 주소)
+CHATMATE_DEDUP_POLL_INTERVAL = float(os.getenv("CHATMATE_DEDUP_POLL_INTERVAL", "0.2"))  # 초
+CHATMATE_HISTORY_CACHE_SIZE = int(os.getenv("CHATMATE_HISTORY_CACHE_SIZE", "1000"))  # 로컬 LRU 세션 수
+
+# 비동기 답변 생성 작업 (Prefer: respond-async 요청은 202 응답 후 백그라운드에서 생성)
+CHATMATE_JOB_WORKERS = int(os.getenv("CHATMATE_JOB_WORKERS", "4"))  # 워커 프로세스당 동시 실행 작업 수
+CHATMATE_JOB_QUEUE_SIZE = int(os.getenv("CHATMATE_JOB_QUEUE_SIZE", "16"))  # 워커 프로세스당 대기 가능한 작업 수 (넘으면 503)
+CHATMATE_JOB_TIMEOUT = int(os.getenv("CHATMATE_JOB_TIMEOUT", "300"))  # 이보다 오래 pending이면 실패 처리 (초)
+CHATMATE_JOB_RETRY_AFTER = int(os.getenv("CHATMATE_JOB_RETRY_AFTER", "5"))  # 대기열이 가득 찼을 때 Retry-After (초)
+CHATMATE_JOB_LONG_POLL_MAX = int(os.getenv("CHATMATE_JOB_LONG_POLL_MAX", "30"))  # 롱 폴링 최대 대기 시간 (초)
+CHATMATE_JOB_POLL_INTERVAL = float(os.getenv("CHATMATE_JOB_POLL_INTERVAL", "0.5"))  # 롱 폴링 DB 확인 간격 (초)
+
+# 유저별 추천 스냅샷 (python manage.py build_recommendation_snapshots 로 배치 계산)
+CHATMATE_SNAPSHOT_ENABLED = os.getenv("CHATMATE_SNAPSHOT_ENABLED", "True") == "True"
+CHATMATE_SNAPSHOT_SIZE = int(os.getenv("CHATMATE_SNAPSHOT_SIZE", "20"))  # 유저당 저장할 후보 수
+CHATMATE_SNAPSHOT_MAX_AGE = int(os.getenv("CHATMATE_SNAPSHOT_MAX_AGE", "172800"))  # 이보다 오래된 스냅샷은 사용하지 않음 (초)
+CHATMATE_SNAPSHOT_GENRE_WEIGHT = float(os.getenv("CHATMATE_SNAPSHOT_GENRE_WEIGHT", "0.5"))  # 선호 게임 대비 선호 장르 가중치
+
+# 유저 취향 벡터 fast path (일반 추천 요청 → 플레이타임 가중 취향 벡터로 바로 검색)
+CHATMATE_TASTE_FAST_PATH_ENABLED = os.getenv("CHATMATE_TASTE_FAST_PATH_ENABLED", "True") == "True"
+
+# /metrics 조회 토큰 (Prometheus scrape 설정의 bearer_token, 비어 있으면 /metrics 비활성화)
+CHATMATE_METRICS_TOKEN = os.getenv("CHATMATE_METRICS_TOKEN", "")
+
+# 챗봇 파이프라인 지연 시간/토큰 로그 출력
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "chatmate": {
+            "handlers": ["console"],
+            "level": os.getenv("CHATMATE_LOG_LEVEL", "INFO"),
+        },
+    },
+}
+
+
 # 환경 변수에서 이메일 설정 로드
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
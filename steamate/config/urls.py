@@ -16,9 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
+from chatmate.views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/account/', include('account.urls')),
-    path('api/v1/chat/', include('chatmate.urls'))
+    path('api/v1/chat/', include('chatmate.urls')),
+    path('metrics', metrics_view),
 ]
\ No newline at end of file